@@ -21,19 +21,1809 @@
 ╚═══════════════════════════════════════════════════════════════════════════╝
 """
 
+import time
+_PROCESS_START = time.perf_counter()
+
 import os
 import sys
 import subprocess
 import platform
 import threading
-import time
 import json
+import copy
+import uuid
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque, OrderedDict
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 import queue
 from threading import Lock, Semaphore, Event
 from queue import Queue, PriorityQueue
 import traceback
+import random
+import heapq
+import argparse
+import contextlib
+import importlib.util
+import atexit
+import weakref
+import gzip
+import hashlib
+import sqlite3
+import socket
+
+class AdaptiveConcurrency:
+    """Ölçülen throughput'a göre AIMD ile büyüyüp küçülen indirme slot semaforu"""
+
+    def __init__(self, initial, minimum, maximum, interval=5.0, log_path=None):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.peak = self.limit
+        self.interval = interval
+        self.log_path = log_path
+        self.growth_threshold = 0.05  # %5'ten az artış = plato
+        self.probe_after = 6          # platoda bu kadar turdan sonra tekrar büyümeyi dene
+        self.decisions = deque(maxlen=256)   # Tam geçmiş log_path dosyasında
+        self.decision_count = 0
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._bytes = 0
+        self._errors = 0
+        self._throttled = 0
+        # Başlangıçta büyüme fazındayız; ilk ölçüm 0'dan büyükse slot artar
+        self._rate_before_grow = 0.0
+        self._last_action = 'grow'
+        self._holds = 0
+        self._stop = Event()
+        self._thread = None
+
+    def acquire(self, timeout=None):
+        """Boş slot açılana kadar bekler (Semaphore.acquire ile uyumlu)"""
+        with self._cond:
+            self._waiting += 1
+            try:
+                if not self._cond.wait_for(lambda: self._active < self.limit, timeout):
+                    return False
+            finally:
+                self._waiting -= 1
+            self._active += 1
+            return True
+
+    def release(self):
+        """Slotu serbest bırakır"""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def record_bytes(self, count):
+        """Progress hook'lardan gelen indirilen byte miktarını ekler"""
+        with self._cond:
+            self._bytes += count
+
+    def record_error(self, throttled=False):
+        """Hata veya throttling (429) yanıtını kaydeder"""
+        with self._cond:
+            if throttled:
+                self._throttled += 1
+            else:
+                self._errors += 1
+
+    def start(self):
+        """Kontrol döngüsünü başlatır"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._control_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Kontrol döngüsünü durdurur"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _control_loop(self):
+        while not self._stop.wait(self.interval):
+            self._adjust()
+
+    def _adjust(self):
+        """Bir örnekleme aralığının sonunda yeni slot sayısına karar verir"""
+        with self._cond:
+            sampled_bytes, errors, throttled = self._bytes, self._errors, self._throttled
+            active, waiting, limit = self._active, self._waiting, self.limit
+            self._bytes = self._errors = self._throttled = 0
+
+        rate = sampled_bytes / self.interval
+        action = 'hold'
+        if throttled:
+            new_limit, reason, action = max(self.minimum, limit // 2), 'throttled', 'shrink'
+        elif errors:
+            new_limit, reason, action = max(self.minimum, limit - 1), 'errors', 'shrink'
+        elif not waiting and active < limit:
+            new_limit, reason = limit, 'no demand'
+        elif self._last_action == 'grow':
+            if rate > self._rate_before_grow * (1 + self.growth_threshold):
+                new_limit, reason, action = min(self.maximum, limit + 1), 'throughput rising', 'grow'
+            else:
+                # Son artış throughput getirmedi: geri al ve platoda kal
+                new_limit, reason, action = max(self.minimum, limit - 1), 'plateau', 'shrink'
+        elif self._holds >= self.probe_after:
+            new_limit, reason, action = min(self.maximum, limit + 1), 'probe', 'grow'
+        else:
+            new_limit, reason = limit, 'plateau hold'
+
+        if action == 'grow':
+            self._rate_before_grow = rate
+        if new_limit == limit and action != 'hold':
+            action = 'hold'
+        self._holds = self._holds + 1 if action == 'hold' else 0
+        self._last_action = action
+
+        with self._cond:
+            self.limit = new_limit
+            self.peak = max(self.peak, new_limit)
+            self._cond.notify_all()
+
+        decision = {
+            'time': round(time.time(), 3),
+            'limit': limit,
+            'new_limit': new_limit,
+            'rate': round(rate),
+            'active': active,
+            'waiting': waiting,
+            'errors': errors,
+            'throttled': throttled,
+            'reason': reason,
+        }
+        self.decisions.append(decision)
+        self.decision_count += 1
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as log_file:
+                    log_file.write(json.dumps(decision) + '\n')
+            except OSError:
+                pass
+
+
+class HostScheduler:
+    """Host başına eşzamanlılık ve istek aralığı uygulayan, öncelikli ve adil (round-robin) iş kuyruğu"""
+
+    def __init__(self, host_limits, capacity=None):
+        self.host_limits = host_limits
+        self.capacity = capacity  # Kabul edilmiş ama başlamamış en fazla iş (geri basınç)
+        self._admitted = 0
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._active = {}
+        self._next_start = {}
+        self._order = deque()
+        self._delayed = []  # (hazır olma zamanı, sıra, host, öncelik, iş): geri çekilmeyle yeniden denenecek işler
+        self._closed = False
+        self._seq = 0
+
+    def _limits(self, host):
+        limits = dict(self.host_limits.get('default', {}))
+        limits.update(self.host_limits.get(host, {}))
+        return limits
+
+    def put(self, host, job, priority=0):
+        """İşi host kuyruğuna ekler; küçük priority önce çıkar, eşitlikte giriş sırası (job['seq']) korunur"""
+        with self._cond:
+            self._put_locked(host, job, priority)
+            self._cond.notify_all()
+
+    def _put_locked(self, host, job, priority):
+        if host not in self._queues:
+            self._queues[host] = PriorityQueue()
+            self._active[host] = 0
+            self._order.append(host)
+        self._seq += 1
+        self._queues[host].put((priority, job.get('seq', self._seq), self._seq, job))
+
+    def put_later(self, host, job, delay, priority=0):
+        """İşi delay saniye sonra kuyruğa geri koyar; bu sürede slot başka işlere kalır"""
+        with self._cond:
+            self._admitted += 1
+            self._seq += 1
+            heapq.heappush(self._delayed, (time.time() + delay, self._seq, host, priority, job))
+            self._cond.notify_all()
+
+    def pause_host(self, host, until):
+        """Host'a until zamanına kadar yeni iş verilmesini durdurur (devre kesici, 429)"""
+        with self._cond:
+            self._next_start[host] = max(self._next_start.get(host, 0), until)
+            self._cond.notify_all()
+
+    def reserve(self, timeout=None):
+        """Kuyrukta yer açılana kadar bekler; yer ayrıldıysa True döner (işi probe/put öncesi çağrılır)"""
+        with self._cond:
+            if self.capacity:
+                self._cond.wait_for(lambda: self._admitted < self.capacity or self._closed, timeout)
+                if self._admitted >= self.capacity:
+                    return False
+            self._admitted += 1
+            return True
+
+    def discard(self):
+        """Yer ayrılmış ama kuyruğa hiç girmeyecek işin yerini bırakır"""
+        with self._cond:
+            self._admitted = max(0, self._admitted - 1)
+            self._cond.notify_all()
+
+    def close(self):
+        """Yeni iş gelmeyeceğini bildirir; kuyruk boşalınca get() None döner"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _select_locked(self, now):
+        """Şu an başlatılabilecek en öncelikli host'u ve bir sonraki uyanma zamanını bulur (kilit altında)"""
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, host, priority, job = heapq.heappop(self._delayed)
+            self._put_locked(host, job, priority)
+        wake_at = self._delayed[0][0] if self._delayed else None
+        best = None
+        for host in self._order:
+            host_queue = self._queues[host]
+            if host_queue.empty():
+                continue
+            limits = self._limits(host)
+            if self._active[host] >= limits['max_concurrent']:
+                continue
+            next_start = self._next_start.get(host, 0)
+            if now < next_start:
+                wake_at = next_start if wake_at is None else min(wake_at, next_start)
+                continue
+            # Eşit öncelikte sıradaki host kazanır (round-robin)
+            priority = host_queue.queue[0][0]
+            if best is None or priority < best[0]:
+                best = (priority, host, limits)
+        return best, wake_at
+
+    def wait_ready(self):
+        """Başlatılabilir bir iş olana kadar bekler; kuyruk tamamen bittiyse False döner
+
+        İş burada verilmez: worker önce eşzamanlılık slotunu alır, sonra take() çağırır.
+        """
+        with self._cond:
+            while True:
+                now = time.time()
+                best, wake_at = self._select_locked(now)
+                if best is not None:
+                    return True
+                # Süren bir iş yeniden denenmek üzere geri gelebilir; kuyruk ancak hepsi bitince kapanır
+                if (self._closed and not self._delayed and all(q.empty() for q in self._queues.values())
+                        and not any(self._active.values())):
+                    return False
+                self._cond.wait(None if wake_at is None else max(0.0, wake_at - now))
+
+    def take(self):
+        """Slotu alınmış worker'a şu an başlatılabilecek işi verir; yoksa (başkası aldıysa) None döner
+
+        Host sayacı ve min_interval aralığı işin gerçekten başladığı bu anda işlenir.
+        """
+        with self._cond:
+            now = time.time()
+            best, _ = self._select_locked(now)
+            if best is None:
+                return None
+            _, host, limits = best
+            # Sıradaki çağrı seçilen host'tan sonrakiyle başlasın (adil dağılım)
+            self._order.rotate(-(self._order.index(host) + 1))
+            self._active[host] += 1
+            self._next_start[host] = now + limits['min_interval']
+            self._admitted = max(0, self._admitted - 1)
+            self._cond.notify_all()
+            return self._queues[host].get_nowait()[-1]
+
+    def get(self):
+        """Sınırları izin veren host'lar arasından en öncelikli işi döndürür (yoksa bekler; kuyruk bittiyse None)"""
+        while self.wait_ready():
+            job = self.take()
+            if job is not None:
+                return job
+        return None
+
+    def done(self, host):
+        """Host üzerindeki aktif iş sayısını azaltır"""
+        with self._cond:
+            self._active[host] -= 1
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """Host başına son işlerin ağ/kısıtlama hata oranını izler; eşik aşılınca host'u artan sürelerle kapatır"""
+
+    def __init__(self, window=20, threshold=0.5, min_samples=5, cooldown=30.0, max_cooldown=600.0):
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = Lock()
+        self._outcomes = {}
+        self._trips = {}
+
+    def record(self, host, failed):
+        """İş sonucunu işler; devre bu sonuçla açıldıysa kapanacağı zamanı, değilse None döndürür"""
+        with self._lock:
+            outcomes = self._outcomes.setdefault(host, deque(maxlen=self.window))
+            outcomes.append(1 if failed else 0)
+            rate = sum(outcomes) / len(outcomes)
+            if len(outcomes) < self.min_samples or rate < self.threshold:
+                if not failed and rate < self.threshold / 2:
+                    self._trips[host] = 0  # Host toparlandı; sonraki açılma yine kısa süreli
+                return None
+            # Her ardışık açılmada bekleme iki katına çıkar
+            trips = self._trips.get(host, 0)
+            self._trips[host] = trips + 1
+            outcomes.clear()
+            return time.time() + min(self.max_cooldown, self.cooldown * 2 ** trips)
+
+
+class JobJournal:
+    """Batch işlerinin durumunu tutan, çökmeye dayanıklı append-only JSONL günlüğü"""
+
+    TERMINAL_STATES = ('done', 'failed', 'cancelled', 'skipped', 'expanded')
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+
+    def record(self, batch_id, url, state, **fields):
+        """Bir iş için yeni durum satırı ekler (her satır hemen diske yazılır)"""
+        entry = {'time': round(time.time(), 3), 'batch': batch_id, 'url': url, 'state': state}
+        entry.update(fields)
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as journal_file:
+                journal_file.write(line)
+                journal_file.flush()
+
+    def load(self):
+        """Günlüğü okuyup batch -> {'settings', 'items'} eşlemesini döndürür"""
+        batches = {}
+        try:
+            with open(self.path, encoding='utf-8') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Çökme sırasında yarım kalmış satır
+                    batch = batches.setdefault(entry['batch'], {'settings': {}, 'items': {}})
+                    if entry['state'] == 'batch':
+                        batch['settings'] = entry
+                    else:
+                        batch['items'].setdefault(entry['url'], {}).update(entry)
+        except FileNotFoundError:
+            pass
+        return batches
+
+    def unfinished(self):
+        """Bitmemiş işleri olan en son batch'i (id, ayarlar, URL'ler) döndürür"""
+        for batch_id, batch in reversed(list(self.load().items())):
+            pending = [url for url, item in batch['items'].items()
+                       if item['state'] not in self.TERMINAL_STATES]
+            if pending:
+                return batch_id, batch['settings'], pending
+        return None
+
+    def start_batch(self, batch_id, **settings):
+        """Yeni batch başlatır; bitmemiş iş kalmadıysa eski kayıtları temizler"""
+        with self._lock:
+            if self.unfinished() is None and os.path.exists(self.path):
+                os.remove(self.path)
+        self.record(batch_id, None, 'batch', **settings)
+
+
+class JobStore:
+    """Birden fazla makinenin paylaştığı, süreli kiralama (lease) ile iş dağıtan SQLite iş deposu"""
+
+    FINISHED_STATES = ('done', 'failed', 'cancelled', 'skipped', 'expanded', 'invalid', 'duplicate')
+
+    def __init__(self, path, node=None, lease_seconds=60.0, max_attempts=3):
+        self.path = path
+        self.node = node or f'{socket.gethostname()}-{os.getpid()}'
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = Lock()
+        self._heartbeat_stop = Event()
+        self._heartbeat_thread = None
+        self._feeding = False
+        # Paylaşımlı diskte WAL desteklenmeyebilir; varsayılan rollback journal kullanılır
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute('CREATE TABLE IF NOT EXISTS jobs (url TEXT PRIMARY KEY, status TEXT NOT NULL, '
+                             'node TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, '
+                             'size INTEGER NOT NULL DEFAULT 0, error TEXT, updated REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS nodes (node TEXT PRIMARY KEY, started REAL, heartbeat REAL)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Yazma kilidini baştan alan (BEGIN IMMEDIATE) işlem; düğümler aynı işi iki kez alamaz"""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value, replace=True):
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        with self._transaction() as db:
+            db.execute(f'{verb} INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    def add(self, urls, chunk_size=500):
+        """URL'leri bekleyen iş olarak ekler (var olanlar atlanır); eklenen sayıyı döndürür"""
+        added = 0
+        chunk = []
+        for url in urls:
+            chunk.append((url, 'pending', time.time()))
+            if len(chunk) >= chunk_size:
+                added += self._insert(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert(chunk)
+        return added
+
+    def _insert(self, rows):
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany('INSERT OR IGNORE INTO jobs (url, status, updated) VALUES (?, ?, ?)', rows)
+            return db.total_changes - before
+
+    def claim(self, limit):
+        """Bekleyen veya kiralaması dolmuş en fazla limit işi bu düğüme kiralar"""
+        now = time.time()
+        with self._transaction() as db:
+            rows = db.execute("SELECT url, attempts FROM jobs WHERE status = 'pending' "
+                              "OR (status = 'leased' AND lease_until < ?) ORDER BY rowid LIMIT ?",
+                              (now, limit)).fetchall()
+            claimed = []
+            for url, attempts in rows:
+                if attempts >= self.max_attempts:
+                    # Düğümleri tekrar tekrar düşüren iş sonsuza dek dağıtılmaz
+                    db.execute("UPDATE jobs SET status = 'failed', node = NULL, error = ?, updated = ? WHERE url = ?",
+                               ('lease expired too many times', now, url))
+                    continue
+                db.execute("UPDATE jobs SET status = 'leased', node = ?, lease_until = ?, attempts = attempts + 1, "
+                           "updated = ? WHERE url = ?", (self.node, now + self.lease_seconds, now, url))
+                claimed.append(url)
+            return claimed
+
+    def finish(self, url, state, size=0, error=None):
+        """Bu düğümün kiraladığı işi sonuçlandırır; 'interrupted' işi başka düğümlere geri bırakır"""
+        now = time.time()
+        with self._transaction() as db:
+            if state == 'interrupted':
+                db.execute("UPDATE jobs SET status = 'pending', node = NULL, lease_until = NULL, "
+                           "attempts = MAX(attempts - 1, 0), updated = ? WHERE url = ? AND node = ? "
+                           "AND status = 'leased'", (now, url, self.node))
+            else:
+                db.execute('UPDATE jobs SET status = ?, size = ?, error = ?, lease_until = NULL, updated = ? '
+                           'WHERE url = ? AND node = ?', (state, size or 0, error, now, url, self.node))
+
+    def held(self):
+        """Bu düğümün elindeki kiralık iş sayısı"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'leased' AND node = ?",
+                                    (self.node,)).fetchone()[0]
+
+    def start_feeding(self):
+        """Bu düğümün kuyruğa URL eklediğini kiralamayla bildirir; kiralama sürdükçe kuyruk mühürlenmez"""
+        self._feeding = True
+        self._renew_feed()
+
+    def _renew_feed(self):
+        with self._transaction() as db:
+            db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                       (f'feeder:{self.node}', json.dumps(time.time() + self.lease_seconds)))
+
+    def finish_feeding(self):
+        """Ekleme bitti (veya durduruldu); bu düğümün besleme kiralaması silinir"""
+        self._feeding = False
+        with self._transaction() as db:
+            db.execute('DELETE FROM meta WHERE key = ?', (f'feeder:{self.node}',))
+
+    def sealed(self):
+        """Besleyen düğüm kalmadıysa True; mühürlemeden ölen düğümün kiralaması dolunca mühürlü sayılır"""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute("SELECT value FROM meta WHERE key LIKE 'feeder:%'").fetchall()
+        return all(json.loads(value) < now for value, in rows)
+
+    def drained(self):
+        """Kuyruk mühürlendiyse ve bekleyen/kiralık iş kalmadıysa True döner"""
+        with self._lock:
+            open_jobs = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')").fetchone()[0]
+        return open_jobs == 0 and self.sealed()
+
+    def release(self):
+        """Bu düğümün başlamamış veya yarım kalmış tüm işlerini diğer düğümlere bırakır"""
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = 'pending', node = NULL, lease_until = NULL, "
+                       "attempts = MAX(attempts - 1, 0), updated = ? WHERE status = 'leased' AND node = ?",
+                       (time.time(), self.node))
+
+    def heartbeat(self):
+        """Düğümün kiralamalarını uzatır ve canlı olduğunu kaydeder"""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET lease_until = ? WHERE status = 'leased' AND node = ?",
+                       (now + self.lease_seconds, self.node))
+            db.execute('INSERT INTO nodes (node, started, heartbeat) VALUES (?, ?, ?) '
+                       'ON CONFLICT(node) DO UPDATE SET heartbeat = excluded.heartbeat', (self.node, now, now))
+        if self._feeding:
+            self._renew_feed()
+
+    def start_heartbeat(self):
+        self.heartbeat()
+        self._heartbeat_stop.clear()
+
+        def beat():
+            while not self._heartbeat_stop.wait(self.lease_seconds / 3):
+                try:
+                    self.heartbeat()
+                except sqlite3.Error:
+                    pass
+
+        self._heartbeat_thread = threading.Thread(target=beat, daemon=True, name='job-store-heartbeat')
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join(timeout=5)
+            self._heartbeat_thread = None
+
+    def stats(self):
+        """Tüm düğümlerin toplam sonuçları: durum sayıları, boyut ve düğüm bazında dağılım"""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute('SELECT status, node, COUNT(*), SUM(size) FROM jobs GROUP BY status, node').fetchall()
+            heartbeats = dict(self._db.execute('SELECT node, heartbeat FROM nodes').fetchall())
+        status = {}
+        nodes = {}
+        total_size = 0
+        for state, node, count, size in rows:
+            status[state] = status.get(state, 0) + count
+            total_size += size or 0
+            if node:
+                item = nodes.setdefault(node, {'done': 0, 'failed': 0, 'size': 0, 'alive': False})
+                if state in ('done', 'failed'):
+                    item[state] += count
+                item['size'] += size or 0
+        for node, beat in heartbeats.items():
+            item = nodes.setdefault(node, {'done': 0, 'failed': 0, 'size': 0, 'alive': False})
+            item['alive'] = now - beat < self.lease_seconds
+        return {'total': sum(status.values()), 'status': status, 'total_size': total_size, 'nodes': nodes}
+
+    def close(self):
+        self.stop_heartbeat()
+        with self._lock:
+            self._db.close()
+
+
+class DownloadArchive:
+    """Extractor+ID ve normalize URL ile O(1) tekrar kontrolü yapan, thread-safe indirme arşivi"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+        self._ids = set()
+        self._urls = set()
+        try:
+            with open(path, encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    line = line.strip()
+                    if line.startswith('url '):
+                        self._urls.add(line[4:])
+                    elif line:
+                        self._ids.add(line)
+        except FileNotFoundError:
+            pass
+
+    def contains(self, archive_id=None, normalized_url=None):
+        """ID veya URL arşivde varsa True döner"""
+        with self._lock:
+            return (archive_id in self._ids) or (normalized_url in self._urls)
+
+    def add(self, archive_id=None, normalized_url=None):
+        """Başarılı indirmeyi arşive ekler (yt-dlp download_archive biçimiyle uyumlu)"""
+        lines = []
+        with self._lock:
+            if archive_id and archive_id not in self._ids:
+                self._ids.add(archive_id)
+                lines.append(archive_id)
+            if normalized_url and normalized_url not in self._urls:
+                self._urls.add(normalized_url)
+                lines.append(f'url {normalized_url}')
+            if lines:
+                with open(self.path, 'a', encoding='utf-8') as archive_file:
+                    archive_file.write('\n'.join(lines) + '\n')
+
+
+class LibraryCatalog:
+    """İndirme klasörünün kalıcı dizini; sayım, toplam boyut ve son indirmeler dosya taramadan okunur"""
+
+    KINDS = {
+        'video': ('.mp4', '.mkv', '.avi', '.mov'),
+        'audio': ('.mp3', '.wav', '.m4a', '.aac'),
+    }
+    PARTIAL_SUFFIXES = ('.part', '.ytdl', '.segments', '.temp')
+
+    def __init__(self, root, path):
+        self.root = root
+        self.path = path
+        self._lock = Lock()
+        self.entries = {}
+        self.dirs = {}
+        self.counts = {'video': 0, 'audio': 0, 'other': 0}
+        self.total_size = 0
+        self._by_dir = {}
+        self._log_lines = 0
+        try:
+            with open(path, encoding='utf-8') as catalog_file:
+                for line in catalog_file:
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue  # Çökme sırasında yarım kalmış satır
+                    self._log_lines += 1
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def kind(cls, name):
+        """Dosya uzantısından video/audio/other türünü döndürür"""
+        suffix = os.path.splitext(name)[1].lower()
+        for kind, suffixes in cls.KINDS.items():
+            if suffix in suffixes:
+                return kind
+        return 'other'
+
+    def _apply(self, record):
+        op = record['op']
+        if op == 'put':
+            entry = record['entry']
+            self._drop(entry['path'])
+            self.entries[entry['path']] = entry
+            self._by_dir.setdefault(os.path.dirname(entry['path']), set()).add(entry['path'])
+            self.counts[entry['kind']] += 1
+            self.total_size += entry['size']
+        elif op == 'del':
+            self._drop(record['path'])
+        elif op == 'dir':
+            self.dirs[record['path']] = {'mtime': record['mtime'], 'subdirs': record['subdirs']}
+
+    def _drop(self, rel_path):
+        entry = self.entries.pop(rel_path, None)
+        if entry is not None:
+            self._by_dir.get(os.path.dirname(rel_path), set()).discard(rel_path)
+            self.counts[entry['kind']] -= 1
+            self.total_size -= entry['size']
+
+    def _commit(self, records):
+        """Kayıtları belleğe uygular ve günlüğe ekler; eski satırlar çoğalınca dosyayı sıkıştırır"""
+        if not records:
+            return
+        for record in records:
+            self._apply(record)
+        with open(self.path, 'a', encoding='utf-8') as catalog_file:
+            catalog_file.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        self._log_lines += len(records)
+        if self._log_lines > 2 * (len(self.entries) + len(self.dirs)) + 1000:
+            self._compact()
+
+    def _compact(self):
+        records = [{'op': 'dir', 'path': rel, **info} for rel, info in self.dirs.items()]
+        records += [{'op': 'put', 'entry': entry} for entry in self.entries.values()]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as catalog_file:
+            catalog_file.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(records)
+
+    def _entry(self, rel_path, st, **meta):
+        entry = {'path': rel_path, 'kind': self.kind(rel_path), 'size': st.st_size,
+                 'mtime': st.st_mtime, 'added': round(time.time(), 3)}
+        entry.update(meta)
+        return entry
+
+    def add(self, filepath, **meta):
+        """Tamamlanan indirmeyi başlık, kaynak URL, extractor, süre ve codec bilgisiyle ekler"""
+        rel_path = os.path.relpath(os.path.abspath(filepath), os.path.abspath(self.root))
+        st = os.stat(filepath)
+        with self._lock:
+            self._commit([{'op': 'put', 'entry': self._entry(rel_path, st, **meta)}])
+
+    def rescan(self):
+        """Yalnızca mtime'ı değişen klasörleri okuyarak dizini diskle eşitler; değişiklik sayısını döndürür"""
+        changes = []
+        with self._lock:
+            pending = ['']
+            while pending:
+                rel_dir = pending.pop()
+                full_dir = os.path.join(self.root, rel_dir)
+                try:
+                    mtime = os.stat(full_dir).st_mtime_ns
+                except OSError:
+                    continue
+                known = self.dirs.get(rel_dir)
+                if known and known['mtime'] == mtime:
+                    pending.extend(known['subdirs'])
+                    continue
+
+                present, subdirs = set(), []
+                with os.scandir(full_dir) as it:
+                    for item in it:
+                        if item.name.startswith('.'):
+                            continue
+                        rel_path = os.path.join(rel_dir, item.name)
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(rel_path)
+                        elif item.is_file() and not item.name.endswith(self.PARTIAL_SUFFIXES):
+                            present.add(rel_path)
+                            # Kayıtlı dosyalar için stat çağrılmaz; yalnızca yeni adlar okunur
+                            if rel_path not in self.entries:
+                                changes.append({'op': 'put', 'entry': self._entry(rel_path, item.stat())})
+                for rel_path in self._by_dir.get(rel_dir, set()) - present:
+                    changes.append({'op': 'del', 'path': rel_path})
+                for rel_sub in known['subdirs'] if known else []:
+                    if rel_sub not in subdirs:
+                        changes += self._forget_dir(rel_sub)
+                changes.append({'op': 'dir', 'path': rel_dir, 'mtime': mtime, 'subdirs': subdirs})
+                pending.extend(subdirs)
+            self._commit(changes)
+        return sum(1 for change in changes if change['op'] != 'dir')
+
+    def _forget_dir(self, rel_dir):
+        """Silinmiş bir klasörün ve alt klasörlerinin kayıtlarını kaldırır"""
+        records = [{'op': 'del', 'path': rel_path} for rel_path in self._by_dir.get(rel_dir, set())]
+        info = self.dirs.pop(rel_dir, None)
+        for rel_sub in info['subdirs'] if info else []:
+            records += self._forget_dir(rel_sub)
+        return records
+
+    def summary(self):
+        """Tür bazında dosya sayıları ve toplam boyut"""
+        with self._lock:
+            return dict(self.counts, files=len(self.entries), total_size=self.total_size)
+
+    def recent(self, count=5):
+        """En son değişen count kaydı heap seçimiyle döndürür (tüm klasör sıralanmaz)"""
+        with self._lock:
+            return heapq.nlargest(count, self.entries.values(), key=lambda entry: entry['mtime'])
+
+
+class InfoCache:
+    """Sıkıştırılmış metadata önbelleği; süre sınırlı, disk bütçeli (LRU) ve thread/süreç güvenli"""
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {'default': 6 * 3600}
+        self._lock = Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+        self._sizes = {}
+        with os.scandir(path) as it:
+            for item in it:
+                if item.name.endswith('.json.gz'):
+                    self._sizes[item.name] = item.stat().st_size
+        self.total_bytes = sum(self._sizes.values())
+
+    def _file(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json.gz'
+
+    def expires(self, entry):
+        """Geçerlilik sonu: extractor TTL'i, stream URL'lerinin kendi bitiş zamanını aşamaz"""
+        expires = entry['fetched'] + self.ttls.get(entry.get('extractor'), self.ttls['default'])
+        if entry.get('url_expires'):
+            expires = min(expires, entry['url_expires'])
+        return expires
+
+    def get(self, key, allow_stale=False, stale_ttl=0):
+        """Süresi dolmamış kaydı döndürür; allow_stale ise stale_ttl içindeki eski kayıt da kabul edilir"""
+        name = self._file(key)
+        file_path = os.path.join(self.path, name)
+        try:
+            with open(file_path, 'rb') as f:
+                entry = json.loads(gzip.decompress(f.read()))
+        except (OSError, ValueError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        fresh = now < self.expires(entry)
+        if entry.get('key') != key or not (fresh or (allow_stale and now < entry['fetched'] + stale_ttl)):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(file_path)  # LRU: son erişim zamanı
+        except OSError:
+            pass
+        self.count_hit(fresh)
+        return entry
+
+    def count_hit(self, fresh=True):
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+
+    def put(self, key, entry):
+        """Kaydı atomik olarak yazar (geçici dosya + os.replace) ve gerekirse eski kayıtları siler"""
+        name = self._file(key)
+        data = gzip.compress(json.dumps(dict(entry, key=key), ensure_ascii=False, default=str).encode('utf-8'),
+                             compresslevel=6)
+        tmp_path = os.path.join(self.path, f'{name}.{uuid.uuid4().hex[:8]}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, os.path.join(self.path, name))
+        with self._lock:
+            self.total_bytes += len(data) - self._sizes.get(name, 0)
+            self._sizes[name] = len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """En uzun süredir okunmayan kayıtları bütçenin %90'ına inene kadar siler (kilit altında)"""
+        entries = []
+        for name in list(self._sizes):
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.path, name)), name))
+            except OSError:
+                self.total_bytes -= self._sizes.pop(name)
+        target = self.max_bytes * 0.9
+        for _, name in sorted(entries):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+            self.total_bytes -= self._sizes.pop(name)
+
+    def delete(self, key):
+        """Kaydı siler (ör. stream URL'si reddedildiğinde)"""
+        name = self._file(key)
+        try:
+            os.remove(os.path.join(self.path, name))
+        except OSError:
+            pass
+        with self._lock:
+            self.total_bytes -= self._sizes.pop(name, 0)
+
+    def counters(self):
+        with self._lock:
+            return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses}
+
+
+class RedirectCache:
+    """Kısa link -> hedef URL eşlemelerini .nexload/redirects.jsonl içinde kalıcı tutar"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+        self.targets = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self.targets[record['url']] = record['target']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+
+    def get(self, url):
+        with self._lock:
+            return self.targets.get(url)
+
+    def put(self, url, target):
+        with self._lock:
+            if self.targets.get(url) == target:
+                return
+            self.targets[url] = target
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'url': url, 'target': target}, ensure_ascii=False) + '\n')
+            except OSError:
+                pass
+
+
+class ConnectionBudget:
+    """Tüm indirmelerin paylaştığı toplam bağlantı (soket) bütçesi"""
+
+    def __init__(self, total):
+        self.total = max(1, total)
+        self.in_use = 0
+        self.peak = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """İndirmenin temel bağlantısını alır (bütçe doluysa bekler)"""
+        with self._cond:
+            self._waiting += 1
+            while self.in_use >= self.total:
+                self._cond.wait()
+            self._waiting -= 1
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+
+    def try_acquire_extra(self, count):
+        """Bekleyen indirme yoksa boştaki bağlantılardan en fazla count tanesini verir"""
+        with self._cond:
+            if self._waiting or count <= 0:
+                return 0
+            granted = max(0, min(count, self.total - self.in_use))
+            self.in_use += granted
+            self.peak = max(self.peak, self.in_use)
+            return granted
+
+    def release(self, count=1):
+        """Bağlantıları bütçeye geri verir"""
+        if count <= 0:
+            return
+        with self._cond:
+            self.in_use -= count
+            self._cond.notify_all()
+
+
+class SegmentedDownloader:
+    """Dosyayı byte aralıklarına bölüp paralel indirir; her segment kaldığı yerden devam eder"""
+
+    def __init__(self, open_range, total_size, path, segments, chunk_size=256 * 1024,
+                 request_size=None, retries=5, progress=None, fatal_errors=(), connections=None):
+        self.open_range = open_range
+        self.total_size = total_size
+        self.path = path
+        self.state_path = path + '.segments'
+        self.segments = max(1, segments)
+        self.chunk_size = chunk_size
+        self.request_size = request_size  # Sunucu tek istekte bu kadar byte verir (ör. YouTube)
+        self.retries = retries
+        self.progress = progress
+        self.fatal_errors = fatal_errors  # Yeniden denenmeyen hatalar (ör. iptal)
+        self.connections = connections    # Aynı anda açık segment bağlantısı (None = segment sayısı)
+        self.ranges = []
+        self.downloaded = 0
+        self._lock = Lock()
+        self._last_save = 0
+
+    @staticmethod
+    def recorded_size(path):
+        """Yarım kalmış segmentli indirmenin kayıtlı toplam boyutunu döndürür (yoksa 0)"""
+        try:
+            with open(path + '.segments', 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('size') or 0)
+        except (OSError, ValueError, TypeError, AttributeError):
+            return 0
+
+    def _load_state(self):
+        """Önceki çalıştırmadan kalan segment ilerlemesini okur"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('size') != self.total_size or not os.path.isfile(self.path):
+            return None
+        if os.path.getsize(self.path) != self.total_size:
+            return None
+        return [list(segment) for segment in state.get('ranges', [])] or None
+
+    def _save_state(self, force=False):
+        """Segment ilerlemesini diske yazar (kilit altında çağrılır)"""
+        now = time.time()
+        if not force and now - self._last_save < 1.0:
+            return
+        self._last_save = now
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({'size': self.total_size, 'ranges': self.ranges}, f)
+
+    def _plan(self):
+        """Dosyayı eşit aralıklara böler ve hedef dosyayı tam boyutta açar"""
+        ranges = self._load_state()
+        if ranges is None:
+            size = -(-self.total_size // self.segments)
+            ranges = []
+            for start in range(0, self.total_size, size):
+                ranges.append([start, min(start + size, self.total_size) - 1, 0])
+            with open(self.path, 'wb') as f:
+                f.truncate(self.total_size)
+        self.ranges = ranges
+        self.downloaded = sum(segment[2] for segment in ranges)
+
+    def _fetch(self, index):
+        """Tek segmenti indirir; hata olursa yazılan son byte'tan yeniden dener"""
+        start, end, _ = self.ranges[index]
+        attempts = 0
+        with open(self.path, 'r+b') as f:
+            while True:
+                with self._lock:
+                    done = self.ranges[index][2]
+                offset = start + done
+                if offset > end:
+                    return
+                request_end = min(end, offset + self.request_size - 1) if self.request_size else end
+                try:
+                    response = self.open_range(offset, request_end)
+                    try:
+                        f.seek(offset)
+                        while offset <= request_end:
+                            chunk = response.read(min(self.chunk_size, request_end - offset + 1))
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            offset += len(chunk)
+                            with self._lock:
+                                self.ranges[index][2] += len(chunk)
+                                self.downloaded += len(chunk)
+                                if self.progress:
+                                    self.progress(self.downloaded, self.total_size)
+                                self._save_state()
+                    finally:
+                        response.close()
+                    if offset <= request_end:
+                        raise IOError(f'segment {index} ended early at byte {offset}')
+                    attempts = 0
+                except self.fatal_errors:
+                    raise
+                except Exception:
+                    attempts += 1
+                    if attempts > self.retries:
+                        raise
+                    f.flush()
+                    time.sleep(min(2 ** attempts, 10))
+
+    def download(self):
+        """Tüm segmentleri paralel indirir; başarılıysa durum dosyasını siler"""
+        self._plan()
+        if self.progress:
+            self.progress(self.downloaded, self.total_size)
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(self.ranges), self.connections or len(self.ranges))) as executor:
+                for future in [executor.submit(self._fetch, i) for i in range(len(self.ranges))]:
+                    future.result()
+        finally:
+            with self._lock:
+                self._save_state(force=True)
+        os.remove(self.state_path)
+        return True
+
+
+def _build_segmented_ydl_class():
+    """yt-dlp yüklendikten sonra bağlantı bütçeli YoutubeDL alt sınıfını oluşturur"""
+    import yt_dlp
+    from yt_dlp.downloader import get_suitable_downloader
+    from yt_dlp.downloader.http import HttpFD
+    from yt_dlp.downloader.fragment import FragmentFD
+    from yt_dlp.networking import Request
+    from yt_dlp.utils import DownloadCancelled
+
+    class SegmentedHttpFD(HttpFD):
+        """Range destekleyen büyük dosyaları bütçeden alınan ek bağlantılarla indirir"""
+
+        def real_download(self, filename, info_dict):
+            ydl = self.ydl
+            tmpfilename = self.temp_name(filename)
+            # Tek bağlantıyla başlamış bir .part dosyası varsa onunla devam edilir
+            single_part = os.path.isfile(tmpfilename) and not os.path.isfile(tmpfilename + '.segments')
+            if single_part or ydl.connection_budget is None:
+                return super().real_download(filename, info_dict)
+
+            url = info_dict['url']
+            headers = dict(info_dict.get('http_headers') or {})
+
+            def open_range(start, end):
+                request_headers = dict(headers, Range=f'bytes={start}-{end}')
+                response = ydl.urlopen(Request(url, headers=request_headers))
+                if response.status != 206:
+                    response.close()
+                    raise IOError(f'server ignored range request (HTTP {response.status})')
+                return response
+
+            options = ydl.segment_options
+            resumable = os.path.isfile(tmpfilename + '.segments')
+            # Boyutu bilinen ve bölünmeye değmeyecek kadar küçük dosyalar için Range probe'u gönderilmez
+            known_size = info_dict.get('filesize') or info_dict.get('filesize_approx')
+            if known_size and known_size < 2 * options['min_size'] and not resumable:
+                return super().real_download(filename, info_dict)
+
+            try:
+                probe = open_range(0, 0)
+                content_range = probe.headers.get('Content-Range', '')
+                probe.close()
+                total_size = int(content_range.rsplit('/', 1)[1])
+                wanted = min(options['max_segments'], total_size // options['min_size']) - 1
+            except DownloadCancelled:
+                raise
+            except Exception:
+                # Probe başarısızsa kayıtlı aralıklar tek bağlantıyla sürdürülür; yarım veri asla silinmez
+                total_size = SegmentedDownloader.recorded_size(tmpfilename) if resumable else 0
+                if resumable and not total_size:
+                    raise
+                wanted = 0
+            extra = ydl.connection_budget.try_acquire_extra(wanted)
+            # Yarım kalmış segmentli indirme ek bağlantı olmasa da tek bağlantıyla sürdürülür
+            if extra == 0 and not resumable:
+                return super().real_download(filename, info_dict)
+
+            started = time.time()
+            last_report = [0.0]
+
+            def progress(downloaded, total):
+                now = time.time()
+                if now - last_report[0] < 0.1 and downloaded < total:
+                    return
+                last_report[0] = now
+                elapsed = now - started
+                speed = downloaded / elapsed if elapsed > 0 else None
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': downloaded,
+                    'total_bytes': total,
+                    'filename': filename,
+                    'tmpfilename': tmpfilename,
+                    'elapsed': elapsed,
+                    'speed': speed,
+                    'eta': (total - downloaded) / speed if speed else None,
+                }, info_dict)
+
+            try:
+                chunk_limit = (info_dict.get('downloader_options') or {}).get('http_chunk_size')
+                SegmentedDownloader(open_range, total_size, tmpfilename, 1 + extra,
+                                    request_size=chunk_limit or self.params.get('http_chunk_size') or None,
+                                    retries=self.params.get('retries', 5), progress=progress,
+                                    fatal_errors=(DownloadCancelled,), connections=1 + extra).download()
+            finally:
+                ydl.connection_budget.release(extra)
+            self.try_rename(tmpfilename, filename)
+            self._hook_progress({
+                'status': 'finished',
+                'downloaded_bytes': total_size,
+                'total_bytes': total_size,
+                'filename': filename,
+                'elapsed': time.time() - started,
+            }, info_dict)
+            return True
+
+    class SegmentedYoutubeDL(yt_dlp.YoutubeDL):
+        """HTTP indirmeleri segmentli motora, HLS/DASH parçalarını sınırlı havuza yönlendirir"""
+
+        connection_budget = None
+        segment_options = {'max_segments': 8, 'min_size': 4 * 1024 * 1024}
+        bandwidth_limiter = None
+        bandwidth_host = None
+        batch_control = None
+        job_key = None
+
+        def urlopen(self, req):
+            control = self.batch_control
+            job = self.job_key
+            if control is not None:
+                control.checkpoint(job)
+            response = super().urlopen(req)
+            limiter = self.bandwidth_limiter
+            if limiter is not None and not limiter.active:
+                limiter = None
+            if limiter is not None or control is not None:
+                # HTTP, segment ve HLS/DASH parçalarının hepsi buradan okunur
+                read = response.read
+                host = self.bandwidth_host
+
+                def gated_read(amt=None):
+                    if control is not None:
+                        control.checkpoint(job)
+                    data = read(amt)
+                    if data and limiter is not None:
+                        limiter.consume(len(data), host)
+                    return data
+                response.read = gated_read
+            return response
+
+        def dl(self, name, info, subtitle=False, test=False):
+            if test or subtitle or name == '-' or not info.get('url') or self.connection_budget is None:
+                return super().dl(name, info, subtitle, test)
+            fd_class = get_suitable_downloader(info, self.params)
+            extra = 0
+            params = self.params
+            if fd_class is HttpFD:
+                fd_class = SegmentedHttpFD
+            elif fd_class is not None and issubclass(fd_class, FragmentFD):
+                # Parça havuzu bütçedeki boş bağlantılarla sınırlıdır
+                wanted = self.params.get('concurrent_fragment_downloads', 1) - 1
+                extra = self.connection_budget.try_acquire_extra(wanted)
+                params = dict(self.params, concurrent_fragment_downloads=1 + extra)
+            else:
+                return super().dl(name, info, subtitle, test)
+            try:
+                fd = fd_class(self, params)
+                for ph in self._progress_hooks:
+                    fd.add_progress_hook(ph)
+                new_info = self._copy_infodict(info)
+                if new_info.get('http_headers') is None:
+                    new_info['http_headers'] = self._calc_headers(new_info)
+                return fd.download(name, new_info, subtitle)
+            finally:
+                self.connection_budget.release(extra)
+
+    return SegmentedYoutubeDL
+
+
+class BandwidthLimiter:
+    """Tüm worker ve segmentlerin paylaştığı token-bucket bant genişliği sınırlayıcı"""
+
+    def __init__(self, rate=None, host_rates=None, schedule=None, burst=0.5, control_path=None):
+        self.burst = burst
+        self.control_path = control_path  # Çalışırken okunan JSON ayar dosyası
+        self.throttled_seconds = 0.0
+        self._lock = Lock()
+        self._base_rate = None
+        self._host_rates = {}
+        self._schedule = []
+        self._buckets = {}
+        self._control_mtime = None
+        self._next_check = 0
+        self.set_rate(rate)
+        self.set_schedule(schedule or [])
+        for host, host_rate in (host_rates or {}).items():
+            self.set_host_rate(host, host_rate)
+
+    @staticmethod
+    def parse_rate(value):
+        """'500K', '2.5M', '1G' veya byte/s sayısını byte/s'ye çevirir (0/None = sınırsız)"""
+        if value in (None, '', 0):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value) if value > 0 else None
+        text = str(value).strip().upper().replace('/S', '')
+        text = text[:-1] if text.endswith('B') else text
+        text = text[:-1] if text.endswith('I') else text
+        units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+        multiplier = units.get(text[-1:], 1)
+        number = float(text[:-1] if text[-1:] in units else text)
+        return number * multiplier if number > 0 else None
+
+    @staticmethod
+    def parse_schedule_entry(entry):
+        """'HH:MM-HH:MM=RATE' ifadesini (başlangıç dakikası, bitiş dakikası, byte/s) yapar"""
+        window, rate = entry.split('=', 1)
+        start, end = window.split('-', 1)
+        to_minutes = lambda text: int(text.split(':')[0]) * 60 + int(text.split(':')[1] if ':' in text else 0)
+        return to_minutes(start), to_minutes(end), BandwidthLimiter.parse_rate(rate)
+
+    def set_rate(self, rate):
+        """Genel sınırı çalışırken değiştirir"""
+        with self._lock:
+            self._base_rate = self.parse_rate(rate)
+
+    def set_host_rate(self, host, rate):
+        """Bir platformun sınırını çalışırken değiştirir (None: kaldır)"""
+        with self._lock:
+            rate = self.parse_rate(rate)
+            if rate is None:
+                self._host_rates.pop(host, None)
+                self._buckets.pop(('host', host), None)
+            else:
+                self._host_rates[host] = rate
+
+    def set_schedule(self, schedule):
+        """Günün saatine göre genel sınırları ayarlar: [(başlangıç dk, bitiş dk, byte/s), ...]"""
+        entries = [self.parse_schedule_entry(e) if isinstance(e, str) else tuple(e) for e in schedule]
+        with self._lock:
+            self._schedule = entries
+
+    def current_rate(self, now=None):
+        """Saat programı dahil geçerli genel sınır (byte/s, None = sınırsız)"""
+        local = time.localtime(now)
+        minute = local.tm_hour * 60 + local.tm_min
+        for start, end, rate in self._schedule:
+            # Gece yarısını geçen aralıklar (ör. 22:00-06:00) desteklenir
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return rate
+        return self._base_rate
+
+    @property
+    def active(self):
+        return bool(self._base_rate or self._host_rates or self._schedule or self.control_path)
+
+    def _reload_control(self, now):
+        """Ayar dosyası değiştiyse sınırları canlı olarak günceller"""
+        self._next_check = now + 2.0
+        try:
+            mtime = os.path.getmtime(self.control_path)
+        except OSError:
+            return
+        if mtime == self._control_mtime:
+            return
+        self._control_mtime = mtime
+        try:
+            with open(self.control_path, 'r', encoding='utf-8') as f:
+                control = json.load(f)
+        except (OSError, ValueError):
+            return
+        if 'rate' in control:
+            self.set_rate(control['rate'])
+        for host, host_rate in (control.get('hosts') or {}).items():
+            self.set_host_rate(host, host_rate)
+        if 'schedule' in control:
+            self.set_schedule(control['schedule'])
+
+    def _take(self, key, rate, amount, now):
+        """Kovadan amount byte düşer; borç varsa ödenmesi için gereken süreyi döndürür"""
+        bucket = self._buckets.get(key)
+        capacity = rate * self.burst
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+        bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate) - amount
+        bucket[1] = now
+        return -bucket[0] / rate if bucket[0] < 0 else 0.0
+
+    def consume(self, amount, host=None):
+        """Okunan byte'ları genel ve host kovalarından düşer, gerekirse bekletir"""
+        if amount <= 0 or not self.active:
+            return
+        now = time.time()
+        if self.control_path and now >= self._next_check:
+            self._reload_control(now)
+        wait = 0.0
+        with self._lock:
+            # Kova paylaşımlıdır: boşta kalan indirmelerin payı aktif indirmelere geçer
+            rate = self.current_rate(now)
+            if rate:
+                wait = self._take('global', rate, amount, now)
+            else:
+                self._buckets.pop('global', None)
+            host_rate = self._host_rates.get(host)
+            if host_rate:
+                wait = max(wait, self._take(('host', host), host_rate, amount, now))
+            if wait > 0:
+                self.throttled_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+
+
+class BatchStopped(Exception):
+    """Batch durdurulduğunda URL besleme döngüsünü kesmek için kullanılır"""
+
+
+class BatchControl:
+    """Batch'i durdurma, duraklatma/devam ettirme ve tek iş iptali için ortak kontrol noktası"""
+
+    def __init__(self, control_path=None):
+        self.control_path = control_path
+        self.stop_event = Event()
+        self._running = Event()
+        self._running.set()
+        self._cancelled = set()
+        self._lock = Lock()
+        self._control_mtime = None
+        self._next_check = 0.0
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def stopping(self):
+        return self.stop_event.is_set()
+
+    def reset(self):
+        """Yeni batch için durdurma, duraklatma ve iptal durumlarını temizler"""
+        self.stop_event.clear()
+        self._running.set()
+        with self._lock:
+            self._cancelled.clear()
+        self._control_mtime = None
+
+    def pause(self):
+        """Yeni işlerin başlamasını ve süren aktarımları duraklatır (.part verisi korunur)"""
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def stop(self):
+        """Yeni iş alınmaz, süren aktarımlar bir sonraki okumada kesilir"""
+        self.stop_event.set()
+        self._running.set()
+
+    def cancel(self, job):
+        """Tek bir işi (URL) iptal eder"""
+        with self._lock:
+            self._cancelled.add(job)
+
+    def is_cancelled(self, job):
+        with self._lock:
+            return job in self._cancelled
+
+    def _reload_control(self):
+        """control.json değiştiyse durumu dosyadan okur (en fazla saniyede bir kontrol edilir)"""
+        if not self.control_path:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + 1.0
+        try:
+            mtime = os.path.getmtime(self.control_path)
+            if mtime == self._control_mtime:
+                return
+            with open(self.control_path, encoding='utf-8') as f:
+                control = json.load(f)
+            self._control_mtime = mtime
+        except (OSError, ValueError):
+            return
+        if control.get('stop'):
+            self.stop()
+        elif control.get('paused'):
+            self.pause()
+        else:
+            self.resume()
+        for job in control.get('cancel') or []:
+            self.cancel(job)
+
+    def wait_if_paused(self):
+        """Duraklatılmışsa devam ettirilene kadar bekler; batch durdurulduysa False döner"""
+        while True:
+            self._reload_control()
+            if self.stopping:
+                return False
+            if self._running.wait(1.0):
+                self._reload_control()
+                if self._running.is_set():
+                    return not self.stopping
+
+    def checkpoint(self, job=None):
+        """Aktarım döngüsünden çağrılır: duraklatmada bekler, durdurma/iptalde DownloadCancelled fırlatır"""
+        self._reload_control()
+        if not self._running.is_set():
+            self.wait_if_paused()
+        if self.stopping or (job is not None and self.is_cancelled(job)):
+            from yt_dlp.utils import DownloadCancelled
+            raise DownloadCancelled('batch stopped' if self.stopping else 'job cancelled')
+
+
+# yt-dlp'nin başlattığı ffmpeg süreçleri; kapanışta sonlandırılır (yetim süreç kalmaz)
+_CHILD_PROCESSES = weakref.WeakSet()
+
+
+def _track_child_processes():
+    """yt-dlp'nin ffmpeg Popen sınıfını kayıt tutan alt sınıfla değiştirir (bir kez)"""
+    from yt_dlp.downloader import external
+    from yt_dlp.postprocessor import ffmpeg
+    for module in (ffmpeg, external):
+        base = module.Popen
+        if getattr(base, 'nexload_tracked', False):
+            continue
+
+        class TrackedPopen(base):
+            nexload_tracked = True
+
+            def __init__(self, *args, **kwargs):
+                if os.name == 'posix':
+                    # Terminaldeki Ctrl-C yalnızca NexLoad'a gider; ffmpeg kontrollü kapatılır
+                    kwargs.setdefault('start_new_session', True)
+                super().__init__(*args, **kwargs)
+                _CHILD_PROCESSES.add(self)
+
+        module.Popen = TrackedPopen
+
+
+def _terminate_child_processes(timeout=5.0):
+    """Çalışan ffmpeg süreçlerini sonlandırır"""
+    processes = [proc for proc in list(_CHILD_PROCESSES) if proc.poll() is None]
+    for proc in processes:
+        try:
+            proc.terminate()
+        except OSError:
+            pass
+    deadline = time.time() + timeout
+    for proc in processes:
+        try:
+            proc.wait(max(0.1, deadline - time.time()))
+        except Exception:
+            proc.kill()
+
+
+atexit.register(_terminate_child_processes)
+
+
+class ProgressBoard:
+    """İndirme ilerlemesini tek render thread'inde sabit hızla çizen merkezi pano"""
+
+    def __init__(self, stream=None, interval=0.2, status_interval=5.0, counts=None, colors=None):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.status_interval = status_interval
+        self.counts = counts  # (başarılı, başarısız, toplam) döndüren fonksiyon
+        self.colors = colors or {}
+        self.interactive = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.completed_bytes = 0
+        self._slots = {}
+        self._next_slot = 0
+        self._lock = Lock()
+        self._samples = deque(maxlen=32)
+        self._rendered_lines = 0
+        self._last_status = 0
+        self._stop = Event()
+        self._thread = None
+
+    def open(self, label, title=''):
+        """Yeni indirme satırı açar; hook'lar bu slotu kilitsiz günceller"""
+        with self._lock:
+            self._next_slot += 1
+            slot = self._next_slot
+            # [etiket, başlık, indirilen, toplam, başlangıç]
+            self._slots[slot] = [label, title, 0, 0, time.time()]
+        return slot
+
+    def update(self, slot, downloaded, total=None):
+        """Hook'tan gelen sayaçları yazar (yalnızca slotun sahibi thread çağırır)"""
+        record = self._slots.get(slot)
+        if record is not None:
+            record[2] = downloaded
+            if total:
+                record[3] = total
+
+    def file_finished(self, slot, size):
+        """Biten dosyanın boyutunu toplam sayaca aktarır ve satırı sıfırlar"""
+        record = self._slots.get(slot)
+        with self._lock:
+            self.completed_bytes += size or (record[2] if record else 0)
+            if record is not None:
+                record[2] = 0
+                record[3] = 0
+
+    def close(self, slot):
+        """İndirme satırını kaldırır"""
+        with self._lock:
+            self._slots.pop(slot, None)
+
+    def start(self):
+        """Render thread'ini başlatır"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._samples.clear()
+        self._last_status = time.time()
+        self._thread = threading.Thread(target=self._render_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Render thread'ini durdurur ve son durumu yazar"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self.interactive:
+            self._clear()
+        else:
+            self._write_status(time.time())
+
+    def _render_loop(self):
+        while not self._stop.wait(self.interval):
+            now = time.time()
+            if self.interactive:
+                self._redraw(now)
+            elif now - self._last_status >= self.status_interval:
+                self._write_status(now)
+
+    def _snapshot(self, now):
+        """Slotların kopyasını alır, toplam hız ve kalan süreyi hesaplar"""
+        with self._lock:
+            slots = [list(record) for record in self._slots.values()]
+            completed = self.completed_bytes
+        transferred = completed + sum(record[2] for record in slots)
+        self._samples.append((now, transferred))
+        first_time, first_bytes = self._samples[0]
+        rate = (transferred - first_bytes) / (now - first_time) if now > first_time else 0.0
+        remaining = sum(max(0, record[3] - record[2]) for record in slots if record[3])
+        eta = remaining / rate if rate > 0 else None
+        return slots, rate, eta
+
+    def _status_line(self, slots, rate, eta):
+        parts = [f'⬇️ {len(slots)} active']
+        if self.counts is not None:
+            successful, failed, total = self.counts()
+            parts.append(f'{successful + failed}/{total} files')
+            if failed:
+                parts.append(f'{failed} failed')
+        parts.append(f'{rate / (1024 * 1024):.2f} MB/s')
+        if eta is not None:
+            parts.append(f'ETA {int(eta // 60)}m {int(eta % 60):02d}s')
+        return ' • '.join(parts)
+
+    def _slot_line(self, record, now):
+        label, title, downloaded, total, started = record
+        elapsed = now - started
+        speed = downloaded / elapsed if elapsed > 0 else 0.0
+        name = (title or '')[:28].ljust(28)
+        if total:
+            fraction = min(1.0, downloaded / total)
+            bar = '█' * int(fraction * 20) + '░' * (20 - int(fraction * 20))
+            size = f'{downloaded / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f} MB'
+            return f'[{label}] {name} {fraction * 100:3.0f}% {bar} {size} {speed / (1024 * 1024):.2f} MB/s'
+        return f'[{label}] {name} {downloaded / (1024 * 1024):.1f} MB {speed / (1024 * 1024):.2f} MB/s'
+
+    def _clear(self):
+        if self._rendered_lines:
+            self.stream.write(f'\x1b[{self._rendered_lines}F\x1b[J')
+            self.stream.flush()
+            self._rendered_lines = 0
+
+    def _redraw(self, now):
+        slots, rate, eta = self._snapshot(now)
+        info = self.colors.get('info', '')
+        reset = self.colors.get('reset', '')
+        lines = [self._slot_line(record, now) for record in sorted(slots, key=lambda r: r[4])]
+        lines.append(f'{info}{self._status_line(slots, rate, eta)}{reset}')
+        output = f'\x1b[{self._rendered_lines}F\x1b[J' if self._rendered_lines else ''
+        self.stream.write(output + '\n'.join(lines) + '\n')
+        self.stream.flush()
+        self._rendered_lines = len(lines)
+
+    def _write_status(self, now):
+        slots, rate, eta = self._snapshot(now)
+        self._last_status = now
+        self.stream.write(time.strftime('%H:%M:%S ') + self._status_line(slots, rate, eta) + '\n')
+        self.stream.flush()
+
+
+class MetricsRecorder:
+    """İş başına faz ölçümlerini JSON satırı olarak yazar, sayaç ve histogramları Prometheus metnine çevirir"""
+
+    SECONDS_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+    BYTES_BUCKETS = (1 << 20, 8 << 20, 32 << 20, 128 << 20, 512 << 20, 2 << 30)
+
+    def __init__(self, path=None, textfile=None):
+        self.path = path
+        self.textfile = textfile
+        self.counters = {}
+        self.histograms = {}
+        self._lock = Lock()
+        self._last_textfile = 0
+        self._server = None
+
+    def _inc(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def _observe(self, name, labels, value, buckets):
+        key = (name, tuple(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                histogram['counts'][i] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def record_job(self, record):
+        """Tamamlanan işi günlüğe yazar ve toplam metrikleri günceller"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self.path:
+                try:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(line + '\n')
+                except OSError:
+                    pass
+            self._inc('nexload_jobs_total', [('status', record['status'])])
+            self._inc('nexload_bytes_total', value=record.get('bytes') or 0)
+            self._inc('nexload_retries_total', value=record.get('retries') or 0)
+            if record.get('error_class'):
+                self._inc('nexload_errors_total', [('error_class', record['error_class'])])
+            if record.get('error_category'):
+                self._inc('nexload_error_categories_total', [('category', record['error_category'])])
+            if record.get('postprocess'):
+                self._inc('nexload_postprocess_total', [('mode', record['postprocess'])])
+            for phase, seconds in record.get('phases', {}).items():
+                self._observe('nexload_phase_seconds', [('phase', phase)], seconds, self.SECONDS_BUCKETS)
+            if record['status'] == 'done':
+                self._observe('nexload_job_bytes', (), record.get('bytes') or 0, self.BYTES_BUCKETS)
+            write_textfile = self.textfile and time.time() - self._last_textfile >= 5
+        if write_textfile:
+            self.write_textfile()
+
+    def render(self):
+        """Metrikleri Prometheus text formatında döndürür"""
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, dict(value, counts=list(value['counts'])))
+                                for key, value in self.histograms.items())
+        lines = []
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name}{label_text(labels)} {value}')
+        for (name, labels), histogram in histograms:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} histogram')
+            for bound, count in zip(histogram['buckets'], histogram['counts']):
+                lines.append(f'{name}_bucket{label_text(labels, [("le", bound)])} {count}')
+            lines.append(f'{name}_bucket{label_text(labels, [("le", "+Inf")])} {histogram["count"]}')
+            lines.append(f'{name}_sum{label_text(labels)} {histogram["sum"]:.6f}')
+            lines.append(f'{name}_count{label_text(labels)} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self):
+        """Metrikleri dosyaya atomik olarak yazar (node_exporter textfile formatı)"""
+        if not self.textfile:
+            return
+        self._last_textfile = time.time()
+        temp_path = self.textfile + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(temp_path, self.textfile)
+        except OSError:
+            pass
+
+    def serve(self, port, host='127.0.0.1'):
+        """/metrics adresini yerel HTTP sunucusunda yayınlar"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        recorder = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = recorder.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_port
+
+    def stop(self):
+        """HTTP sunucusunu kapatır"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
 
 class NexLoadCore:
     def __init__(self):
@@ -43,15 +1833,27 @@ class NexLoadCore:
             'yt-dlp',
             'requests',
             'colorama',
-            'tqdm',
             'mutagen'
         ]
+        # Ortam kontrolü önbelleği ve periyodik yt-dlp güncellemesi
+        self.ytdlp_update_interval = 7 * 24 * 3600
+        self.startup_time = None
         self.supported_sites = [
             'youtube', 'tiktok', 'instagram', 'twitter', 'x.com',
             'linkedin', 'pinterest', 'spotify', 'soundcloud',
             'facebook', 'vimeo', 'dailymotion', 'twitch', 'reddit',
             'bilibili', 'rumble', 'odysee', 'bitchute'
         ]
+        # Desteklenen alan adları -> platform (host bazlı zamanlama anahtarı)
+        self.platform_domains = {
+            'youtube.com': 'youtube', 'youtu.be': 'youtube', 'tiktok.com': 'tiktok',
+            'instagram.com': 'instagram', 'twitter.com': 'twitter', 'x.com': 'twitter',
+            'linkedin.com': 'linkedin', 'pinterest.com': 'pinterest', 'pin.it': 'pinterest',
+            'spotify.com': 'spotify', 'soundcloud.com': 'soundcloud', 'facebook.com': 'facebook',
+            'fb.watch': 'facebook', 'vimeo.com': 'vimeo', 'dailymotion.com': 'dailymotion',
+            'twitch.tv': 'twitch', 'reddit.com': 'reddit', 'bilibili.com': 'bilibili',
+            'rumble.com': 'rumble', 'odysee.com': 'odysee', 'bitchute.com': 'bitchute'
+        }
         self.quality_options = {
             '1': ('🎯 4K Ultra (3840x2160)', 'bestvideo[height<=2160]+bestaudio/best[height<=2160]'),
             '2': ('🔥 1440p QHD (2560x1440)', 'bestvideo[height<=1440]+bestaudio/best[height<=1440]'),
@@ -63,23 +1865,126 @@ class NexLoadCore:
             '8': ('🔧 144p Minimal (256x144)', 'bestvideo[height<=144]+bestaudio/best[height<=144]'),
             '9': ('🎵 Audio Only (MP3 320kbps)', 'bestaudio/best')
         }
+        # mp4 içine yeniden kodlamadan kopyalanabilen codec aileleri
+        self.mp4_copy_codecs = {
+            'video': {'h264', 'h265', 'av1'},
+            'audio': {'aac', 'mp3', 'ac3', 'eac3'},
+        }
         
         # Thread management
         self.max_workers = self._get_optimal_workers()
+        self.postprocess_workers = self._get_optimal_postprocess_workers()
         self.download_lock = Lock()
         self.stats_lock = Lock()
         self.progress_lock = Lock()
-        self.download_semaphore = Semaphore(self.max_workers)
-        self.stop_event = Event()
+        self.adaptive_workers = True
+        self.min_workers = 2
+        self.max_workers_cap = 16
+        # Probe aşaması: sıradaki URL'lerin metadata'sı indirmeler sürerken çıkarılır
+        self.probe_workers = 2
+        self.job_order = 'longest'    # 'longest' (makespan), 'shortest' veya 'fifo'
+        # Girdi okunurken kuyrukta (probe + host kuyruğu) bekleyebilecek en fazla iş; sıralama bu pencerede yapılır
+        self.queue_window = 64
+        # Kısa linkler batch girişinde, indirme slotu tutmadan paralel çözülür
+        self.resolve_workers = 4
+        self.short_link_hosts = {'pin.it', 'fb.watch', 't.co'}
+        self.redirect_cache = None
+        self._host_index = None
+        self._host_index_source = None
+        self.download_semaphore = AdaptiveConcurrency(self.max_workers, self.max_workers, self.max_workers)
+        # Host başına en fazla eşzamanlı indirme ve iki başlangıç arası en kısa süre (sn)
+        self.host_limits = {
+            'default': {'max_concurrent': 4, 'min_interval': 0.5},
+            'instagram': {'max_concurrent': 2, 'min_interval': 2.0},
+            'twitter': {'max_concurrent': 2, 'min_interval': 1.0},
+            'tiktok': {'max_concurrent': 3, 'min_interval': 1.0},
+        }
+        # Hata sınıfına göre politika: geçici ağ hatası ve 429 geri çekilmeyle kuyruğa döner (slot bırakılır),
+        # format hatası sıradaki formatı dener, kalıcı hata (özel, silinmiş, coğrafi engel) hemen başarısız olur
+        self.retry_policy = {
+            'transient': {'retries': 3, 'base': 2.0, 'cap': 60.0},
+            'throttled': {'retries': 4, 'base': 15.0, 'cap': 300.0},
+            'format': {'retries': 2, 'base': 0.0, 'cap': 0.0},
+            # Tanınmayan hatalar geçici sayılır ama tek deneme hakkı alır
+            'unknown': {'retries': 1, 'base': 2.0, 'cap': 60.0},
+        }
+        self.permanent_error_markers = (
+            'private video', 'video unavailable', 'has been removed', 'drm protected', 'members-only',
+            'sign in to confirm your age', 'account has been terminated', 'copyright', 'not available in your country',
+            'http error 404', 'http error 410',
+        )
+        # yt-dlp deneme hakkı bitince yalnızca mesaj iletir (exc_info boş); bu ifadeler geçici ağ hatasıdır
+        self.transient_error_markers = (
+            'http error 5', 'http error 408', 'giving up after', 'bytes read', 'more expected',
+            'connection refused', 'connection reset', 'connection aborted', 'timed out', 'remote end closed',
+            'temporary failure in name resolution', 'incompleteread',
+        )
+        # Ağ/kısıtlama hata oranı eşiği aşan host, diğer host'lar slotları kullanırken bir süre beklemeye alınır
+        self.circuit_breaker_options = {'window': 20, 'threshold': 0.5, 'min_samples': 5, 'cooldown': 30.0}
+        self.circuit_breaker = CircuitBreaker(**self.circuit_breaker_options)
+        # Segmentli indirme: tüm indirmeler tek bağlantı bütçesini paylaşır
+        self.max_connections = 16
+        self.max_segments = 8
+        self.segment_min_size = 4 * 1024 * 1024
+        self.fragment_workers = 8
+        self.connection_budget = ConnectionBudget(self.max_connections)
+        # Süreç genelinde bant genişliği sınırı (platform bazlı sınırlar ve saat programı dahil)
+        self.bandwidth = BandwidthLimiter()
+        self._ydl_class = None
+        # Kısa link çözümü için host başına havuzlu HTTP oturumları
+        self._http_sessions = {}
+        self._http_sessions_lock = Lock()
+        # yt-dlp'nin kendi extractor'larından önce denenecek ek extractor sınıfları
+        self.extra_extractors = []
+        # İş başına faz ölçümleri (.nexload/metrics.jsonl) ve Prometheus metrikleri
+        self.metrics = None
+        self.metrics_port = None
+        # Batch durdurma/duraklatma/iş iptali (.nexload/control.json veya Ctrl-C ile)
+        self.batch_control = BatchControl()
+        self.stop_event = self.batch_control.stop_event
+        self.shutdown_timeout = 10.0
+        self._feeding = False
+        
+        # İndirme arşivi: daha önce inen medya batch'te ağa çıkmadan atlanır
+        self.use_archive = True
+        self.archive = None
+        # İndirme klasörünün kalıcı dizini (.nexload/catalog.jsonl)
+        self.catalog = None
+        self._extractor_classes = None
+        # Playlist/kanal linkleri batch'te sayfa sayfa açılır; tür bilgisi belirsiz extractor'lardan liste sayılanlar
+        self.expand_playlists = True
+        self.collection_extractors = {'YoutubeTab'}
+        self.max_expand_depth = 3
+        
+        # Batch iş günlüğü (batch sırasında ayarlanır)
+        self.journal = None
+        self.batch_id = None
+        # Çok makineli mod: işler paylaşımlı SQLite deposundan kiralanır (headless --store)
+        self.job_store = None
+        self.store_poll_interval = 1.0
+        
+        # Extraction cache - URL başına tek metadata çıkarımı
+        self.info_cache = OrderedDict()
+        self.info_cache_lock = Lock()
+        self.info_cache_entries = 128   # Bellekteki en fazla info dict (LRU); kuyruk penceresinin iki katı
+        # Kalıcı metadata önbelleği (.nexload/info_cache); stream URL'leri extractor'a göre farklı sürede eskir
+        self.use_info_cache = True
+        self.info_cache_ttls = {'default': 6 * 3600, 'Youtube': 5 * 3600, 'Generic': 3600}
+        self.info_cache_stale_ttl = 30 * 24 * 3600   # Başlık/süre gibi sabit alanlar için kabul edilen yaş
+        self.info_cache_max_bytes = 256 * 1024 * 1024
+        self.disk_info_cache = None
         
         # Download statistics
+        self.recent_results = 50   # Bellekte tutulan son sonuç/hata sayısı; tamamı iş günlüğünde
         self.download_stats = {
             'total': 0,
             'successful': 0,
             'failed': 0,
             'total_size': 0,
             'total_time': 0,
-            'downloads': []
+            'downloads': deque(maxlen=self.recent_results),
+            'postprocess_modes': {},
+            'errors': deque(maxlen=self.recent_results)
         }
         
         # Initialize colorama for cross-platform colors
@@ -98,6 +2003,14 @@ class NexLoadCore:
             }
         except ImportError:
             self.colors = {key: '' for key in ['primary', 'secondary', 'success', 'warning', 'error', 'info', 'highlight', 'reset']}
+        
+        # Tüm indirmelerin ilerlemesi tek render thread'inden çizilir
+        self.progress_board = ProgressBoard(counts=self._progress_counts, colors=self.colors)
+
+    def _progress_counts(self):
+        """Pano durum satırı için (başarılı, başarısız, toplam) sayıları"""
+        stats = self.download_stats
+        return stats['successful'], stats['failed'], stats['total']
 
     def _get_optimal_workers(self):
         """CPU sayısına göre optimal worker sayısını belirler"""
@@ -106,6 +2019,12 @@ class NexLoadCore:
         # 4-8 arası optimal worker sayısı
         return min(max(4, cpu_count), 8)
 
+    def _get_optimal_postprocess_workers(self):
+        """ffmpeg son işlemleri için CPU'yu aşırı yüklemeyen worker sayısı"""
+        import multiprocessing
+        # ffmpeg kendi içinde çok çekirdek kullanır; çekirdek başına bir iş fazla olur
+        return max(1, multiprocessing.cpu_count() // 2)
+
     def _get_downloads_path(self):
         """İşletim sistemine göre indirme klasörünü belirler"""
         if self.system == 'windows':
@@ -172,37 +2091,102 @@ class NexLoadCore:
         print(f"{c['error']}❌ Failed to install {package}!{c['reset']}")
         return False
 
-    def check_and_install_dependencies(self):
-        """Gerekli kütüphaneleri kontrol eder ve yükler"""
-        c = self.colors
-        print(f"{c['info']}🔍 Scanning dependencies...{c['reset']}")
-        missing_packages = []
-        
+    def _installed_versions(self):
+        """Gerekli paketlerin kurulu sürümlerini modülleri import etmeden okur"""
+        try:
+            from importlib import metadata
+        except ImportError:  # Python 3.7
+            metadata = None
+        versions = {}
         for package in self.required_packages:
-            try:
-                __import__(package.replace('-', '_'))
-                print(f"{c['success']}✅ {package}{c['reset']} - {c['success']}OK{c['reset']}")
-            except ImportError:
-                missing_packages.append(package)
-                print(f"{c['warning']}⚠️ {package}{c['reset']} - {c['error']}MISSING{c['reset']}")
-
-        if missing_packages:
-            print(f"\n{c['warning']}📦 Installing {len(missing_packages)} missing packages...{c['reset']}")
-            
-            print(f"{c['info']}📦 Updating pip...{c['reset']}", end='', flush=True)
-            self._execute_command(f"{sys.executable} -m pip install --upgrade pip --quiet")
-            print(f"\r{c['success']}✓ Pip updated{c['reset']}")
+            version = None
+            if importlib.util.find_spec(package.replace('-', '_')) is not None:
+                version = 'unknown'
+                if metadata is not None:
+                    try:
+                        version = metadata.version(package)
+                    except metadata.PackageNotFoundError:
+                        pass
+            versions[package] = version
+        return versions
+
+    def _load_env_cache(self):
+        """Son doğrulanan ortam bilgisini okur"""
+        try:
+            with open(self._state_file('environment.json'), 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_env_cache(self, cache, **fields):
+        """Doğrulanan paket sürümlerini ve zaman damgasını kaydeder"""
+        cache.update(fields)
+        cache['python'] = sys.executable
+        cache['packages'] = self._installed_versions()
+        cache['checked_at'] = time.time()
+        try:
+            with open(self._state_file('environment.json'), 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+        except OSError:
+            pass
+
+    def check_and_install_dependencies(self, force=False):
+        """Gerekli kütüphaneleri kontrol eder ve yükler (değişiklik yoksa önbellekten)"""
+        c = self.colors
+        cache = self._load_env_cache()
+        versions = self._installed_versions()
+        cached = (not force and cache.get('python') == sys.executable
+                  and cache.get('packages') == versions and None not in versions.values())
+
+        if cached:
+            print(f"{c['success']}✅ Dependencies verified{c['reset']} {c['info']}(cached, yt-dlp {versions.get('yt-dlp')}){c['reset']}")
+        else:
+            print(f"{c['info']}🔍 Scanning dependencies...{c['reset']}")
+            missing_packages = []
             
-            for package in missing_packages:
-                if not self._install_package(package):
-                    self._reinstall_all_packages()
-                    return
+            for package in self.required_packages:
+                try:
+                    __import__(package.replace('-', '_'))
+                    print(f"{c['success']}✅ {package}{c['reset']} - {c['success']}OK{c['reset']}")
+                except ImportError:
+                    missing_packages.append(package)
+                    print(f"{c['warning']}⚠️ {package}{c['reset']} - {c['error']}MISSING{c['reset']}")
 
-        print(f"{c['info']}🔄 Updating yt-dlp...{c['reset']}", end='', flush=True)
-        self._execute_command(f"{sys.executable} -m pip install --upgrade yt-dlp --quiet")
-        print(f"\r{c['success']}✓ yt-dlp updated{c['reset']}")
+            if missing_packages:
+                print(f"\n{c['warning']}📦 Installing {len(missing_packages)} missing packages...{c['reset']}")
+                
+                print(f"{c['info']}📦 Updating pip...{c['reset']}", end='', flush=True)
+                self._execute_command(f"{sys.executable} -m pip install --upgrade pip --quiet")
+                print(f"\r{c['success']}✓ Pip updated{c['reset']}")
+                
+                for package in missing_packages:
+                    if not self._install_package(package):
+                        self._reinstall_all_packages()
+                        return
+
+        # yt-dlp güncellemesi her açılışta değil, periyodik veya istek üzerine yapılır
+        if force or time.time() - cache.get('yt_dlp_updated_at', 0) > self.ytdlp_update_interval:
+            self.update_yt_dlp(cache)
+        elif not cached:
+            self._save_env_cache(cache)
         
-        print(f"\n{c['success']}✅ All dependencies ready!{c['reset']}\n")
+        if not cached:
+            print(f"\n{c['success']}✅ All dependencies ready!{c['reset']}\n")
+
+    def update_yt_dlp(self, cache=None):
+        """yt-dlp'yi günceller ve ortam önbelleğini yeniler"""
+        c = self.colors
+        print(f"{c['info']}🔄 Updating yt-dlp...{c['reset']}", end='', flush=True)
+        success, _ = self._execute_command(f"{sys.executable} -m pip install --upgrade yt-dlp --quiet")
+        if success:
+            print(f"\r{c['success']}✓ yt-dlp updated{c['reset']}")
+        else:
+            print(f"\r{c['warning']}⚠️ yt-dlp update failed, using installed version{c['reset']}")
+        cache = self._load_env_cache() if cache is None else cache
+        # Başarısız denemeler de kaydedilir; çevrimdışıyken her açılışta yeniden denenmez
+        self._save_env_cache(cache, yt_dlp_updated_at=time.time())
+        return success
 
     def _reinstall_all_packages(self):
         """Tüm kütüphaneleri siler ve yeniden yükler"""
@@ -216,6 +2200,50 @@ class NexLoadCore:
             
         for package in self.required_packages:
             self._install_package(package)
+        self._save_env_cache(self._load_env_cache(), yt_dlp_updated_at=time.time())
+
+    def _state_file(self, name):
+        """NexLoad durum dosyaları (.nexload klasörü) için yol döndürür"""
+        state_dir = os.path.join(self.downloads_path, '.nexload')
+        os.makedirs(state_dir, exist_ok=True)
+        return os.path.join(state_dir, name)
+
+    def _journal_state(self, url, state, **fields):
+        """Aktif batch varsa işin durumunu günlüğe yazar"""
+        if self.journal is not None and self.batch_id:
+            try:
+                self.journal.record(self.batch_id, url, state, **fields)
+            except OSError:
+                pass
+        if self.job_store is not None and (state in JobStore.FINISHED_STATES or state == 'interrupted'):
+            self._store_finish(url, state, **fields)
+
+    def _store_finish(self, url, state, path=None, error=None, **fields):
+        """İşin sonucunu paylaşımlı depoya yazar (boyut dosyadan okunur)"""
+        size = 0
+        if state == 'done' and path:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                pass
+        try:
+            self.job_store.finish(url, state, size=size, error=error)
+        except sqlite3.Error:
+            pass
+
+    def _claim_urls(self, store):
+        """Depodan iş kiralayan generator; elde yalnızca aktif slot + probe kadar iş tutar, kuyruk boşalınca biter"""
+        while not self.batch_control.stopping:
+            # Fazla kiralanan iş diğer düğümleri aç bırakır; kuyruk yalnızca kısa bir ön okuma kadar dolar
+            free = self.download_semaphore.limit + self.probe_workers - store.held()
+            claimed = store.claim(min(free, 8)) if free > 0 else []
+            if claimed:
+                yield from claimed
+                continue
+            if store.drained():
+                return
+            # Diğer düğümlerin kiraları sürüyor veya kuyruk hâlâ besleniyor
+            self.batch_control.stop_event.wait(self.store_poll_interval)
 
     def _create_download_directory(self):
         """İndirme klasörünü oluşturur"""
@@ -227,21 +2255,225 @@ class NexLoadCore:
             print(f"{c['error']}❌ Cannot create directory: {e}{c['reset']}")
             self.downloads_path = os.getcwd()
 
+    def _url_host(self, url):
+        """URL'nin küçük harfli host adını döndürür (şemasız girişlerde https varsayılır)"""
+        url = url.strip()
+        if '://' not in url:
+            url = 'https://' + url
+        try:
+            return urlparse(url).hostname or ''
+        except ValueError:
+            return ''
+
+    def _match_platform(self, host):
+        """Host'u alan adı sonekleriyle sözlükte arar; platform adı veya None döner"""
+        # platform_domains değişirse indeks yeniden kurulur
+        source = (id(self.platform_domains), len(self.platform_domains))
+        if self._host_index_source != source:
+            self._host_index = {domain.lower(): name for domain, name in self.platform_domains.items()}
+            self._host_index_source = source
+        index = self._host_index
+        while host:
+            platform_name = index.get(host)
+            if platform_name is not None:
+                return platform_name
+            host = host.partition('.')[2]
+        return None
+
     def _validate_url(self, url):
         """URL geçerliliğini kontrol eder"""
         if not url or not isinstance(url, str):
             return False
-        
-        url = url.strip().lower()
-        valid_domains = [
-            'youtube.com', 'youtu.be', 'tiktok.com', 'instagram.com',
-            'twitter.com', 'x.com', 'linkedin.com', 'pinterest.com', 'pin.it',
-            'spotify.com', 'soundcloud.com', 'facebook.com', 'fb.watch',
-            'vimeo.com', 'dailymotion.com', 'twitch.tv', 'reddit.com',
-            'bilibili.com', 'rumble.com', 'odysee.com', 'bitchute.com'
-        ]
-        
-        return any(domain in url for domain in valid_domains)
+        # Kısa linkler (t.co gibi) platform listesinde olmasa da çözümlenmek üzere kabul edilir
+        return self._match_platform(self._url_host(url)) is not None or self._is_short_link(url)
+
+    def _host_key(self, url):
+        """URL'nin ait olduğu platformu (zamanlayıcı anahtarı) döndürür"""
+        host = self._url_host(url)
+        return self._match_platform(host) or host or 'unknown'
+
+    def _canonical_url(self, url):
+        """İşçilere gidecek URL: şema eklenir, host küçültülür, izleme parametreleri ve fragment atılır"""
+        url = url.strip()
+        if '://' not in url:
+            url = 'https://' + url
+        try:
+            parsed = urlparse(url)
+            port = parsed.port
+        except ValueError:
+            return url
+        host = (parsed.hostname or '').lower()
+        if host in ('youtu.be', 'www.youtu.be') and parsed.path.strip('/'):
+            # youtu.be/<id> ağa çıkmadan uzun forma çevrilir
+            query = [('v', parsed.path.strip('/').split('/')[0])] + parse_qsl(parsed.query, keep_blank_values=True)
+            return self._canonical_url(urlunparse(('https', 'www.youtube.com', '/watch', '', urlencode(query), '')))
+        if port:
+            host = f'{host}:{port}'
+        tracking = {'fbclid', 'gclid', 'si', 'feature', 'igshid'}
+        query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                 if k.lower() not in tracking and not k.lower().startswith('utm_')]
+        return urlunparse((parsed.scheme.lower(), host, parsed.path, parsed.params, urlencode(query), ''))
+
+    def _normalize_url(self, url):
+        """Tekrar kontrolü için URL'yi normalize eder (şema, www, izleme parametreleri)"""
+        parsed = urlparse(url.strip())
+        host = (parsed.hostname or '').lower()
+        for prefix in ('www.', 'm.'):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+        if parsed.port:
+            host = f'{host}:{parsed.port}'
+        tracking = {'fbclid', 'gclid', 'si', 'feature', 'igshid'}
+        query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                       if k.lower() not in tracking and not k.lower().startswith('utm_'))
+        return urlunparse(('https', host, parsed.path.rstrip('/') or '/', '', urlencode(query), ''))
+
+    def _match_extractor(self, url):
+        """URL'yi ağa çıkmadan işleyecek yt-dlp extractor sınıfını bulur"""
+        if self._extractor_classes is None:
+            from yt_dlp.extractor import gen_extractor_classes
+            self._extractor_classes = list(self.extra_extractors) + list(gen_extractor_classes())
+        for ie in self._extractor_classes:
+            if ie.suitable(url):
+                return ie
+        return None
+
+    def _archive_id(self, url):
+        """URL'den 'extractor id' arşiv anahtarını çıkarır (bulunamazsa None)"""
+        try:
+            from yt_dlp.utils import make_archive_id
+            ie = self._match_extractor(url)
+            video_id = ie.get_temp_id(url) if ie and ie.ie_key() != 'Generic' else None
+            return make_archive_id(ie, video_id) if video_id else None
+        except Exception:
+            return None
+
+    def _is_collection_url(self, url):
+        """URL playlist/kanal gibi birden fazla medya içeriyorsa True döner (ağa çıkmadan)"""
+        ie = self._match_extractor(url)
+        if ie is None:
+            return False
+        single = ie.is_single_video(url)
+        return single is False or (single is None and ie.ie_key() in self.collection_extractors)
+
+    def _iter_collection_entries(self, url, depth=0):
+        """Playlist/kanal girdilerini düz çıkarımla sayfa sayfa üreten generator"""
+        ydl_opts = self._base_ydl_opts(url)
+        ydl_opts['extract_flat'] = 'in_playlist'
+        with self._ydl_context(ydl_opts, host=self._host_key(url)) as ydl:
+            # process=False: girdiler tembel kalır, sonraki sayfalar ancak okundukça istenir
+            result = ydl.extract_info(url, download=False, process=False)
+        yield from self._iter_result_entries(result, url, depth)
+
+    def _iter_result_entries(self, result, url, depth):
+        result_type = result.get('_type', 'video')
+        if result_type in ('url', 'url_transparent'):
+            entry_url = result.get('url')
+            if depth < self.max_expand_depth and entry_url and self._is_collection_url(entry_url):
+                yield from self._iter_collection_entries(entry_url, depth + 1)
+            else:
+                yield entry_url or url
+            return
+        if result_type not in ('playlist', 'multi_video'):
+            yield url
+            return
+
+        entries = result.get('entries') or []
+        if hasattr(entries, 'getpage'):
+            # yt-dlp PagedList: her sayfa ayrı istekle gelir
+            def paged(entries=entries):
+                page = 0
+                while True:
+                    items = entries.getpage(page)
+                    if not items:
+                        return
+                    yield from items
+                    page += 1
+            entries = paged()
+        for entry in entries:
+            if not entry:
+                continue
+            if entry.get('_type') in ('playlist', 'multi_video') and depth < self.max_expand_depth:
+                yield from self._iter_result_entries(entry, url, depth + 1)
+                continue
+            entry_url = entry.get('webpage_url') or entry.get('url')
+            if not entry_url or not entry_url.startswith(('http://', 'https://')):
+                continue
+            if (entry.get('_type') in ('url', 'url_transparent') and depth < self.max_expand_depth
+                    and self._is_collection_url(entry_url)):
+                yield from self._iter_collection_entries(entry_url, depth + 1)
+            else:
+                yield entry_url
+
+    def _expand_urls(self, urls):
+        """Girdi URL'lerini sırayla üretir; playlist/kanal linklerinin yerine girdilerini koyar"""
+        for url in urls:
+            url = url.strip()
+            if not url:
+                continue
+            if not (self.expand_playlists and self._validate_url(url) and self._is_collection_url(url)):
+                yield url
+                continue
+            self._journal_state(url, 'queued')
+            try:
+                if self.job_store is not None:
+                    # Çok makineli modda girdiler depoya eklenir, herhangi bir düğüm alabilir
+                    self.job_store.add(self._canonical_url(entry) for entry in self._iter_collection_entries(url))
+                else:
+                    yield from self._iter_collection_entries(url)
+            except Exception as e:
+                if self.batch_control.stopping:
+                    return
+                with self.stats_lock:
+                    self.download_stats['total'] += 1
+                self._journal_state(url, 'failed', error=str(e)[:300])
+                self._record_failure(url, e)
+                continue
+            self._journal_state(url, 'expanded')
+
+    def _get_archive(self):
+        """Paylaşılan indirme arşivini yükler"""
+        if self.archive is None:
+            self.archive = DownloadArchive(self._state_file('archive.txt'))
+        return self.archive
+
+    def _get_catalog(self):
+        """İndirme klasörünün kütüphane dizinini yükler"""
+        if self.catalog is None or self.catalog.root != self.downloads_path:
+            self.catalog = LibraryCatalog(self.downloads_path, self._state_file('catalog.jsonl'))
+        return self.catalog
+
+    def _catalog_info(self, url, info):
+        """Kütüphane dizini için indirilen medyanın özet bilgilerini çıkarır"""
+        return {
+            'title': info.get('title'),
+            'url': info.get('webpage_url') or url,
+            'extractor': info.get('extractor_key'),
+            'duration': info.get('duration'),
+            'vcodec': info.get('vcodec'),
+            'acodec': info.get('acodec'),
+        }
+
+    def _catalog_record(self, filepath, catalog_info):
+        """Başarılı indirmeyi kütüphane dizinine işler"""
+        try:
+            if filepath and os.path.isfile(filepath):
+                self._get_catalog().add(filepath, **catalog_info)
+        except Exception:
+            pass
+
+    def _archive_record(self, url, info):
+        """Başarılı indirmeyi arşive işler"""
+        if not self.use_archive:
+            return
+        try:
+            from yt_dlp.utils import make_archive_id
+            archive_id = None
+            if info.get('id') and info.get('extractor_key'):
+                archive_id = make_archive_id(info['extractor_key'], info['id'])
+            self._get_archive().add(archive_id, self._normalize_url(url))
+        except Exception:
+            pass
 
     def _create_logger(self):
         """yt-dlp için özel logger oluşturur"""
@@ -262,254 +2494,984 @@ class NexLoadCore:
         
         return CustomLogger()
 
-    def _get_ffmpeg_path(self):
-        """FFmpeg yolunu bulur"""
-        import shutil
-        ffmpeg_path = shutil.which('ffmpeg')
-        return ffmpeg_path if ffmpeg_path else None
+    def _get_ffmpeg_path(self):
+        """FFmpeg yolunu bulur"""
+        import shutil
+        ffmpeg_path = shutil.which('ffmpeg')
+        return ffmpeg_path if ffmpeg_path else None
+
+    def _is_short_link(self, url):
+        host = self._url_host(url)
+        return (host[4:] if host.startswith('www.') else host) in self.short_link_hosts
+
+    def _get_redirect_cache(self):
+        """Kalıcı kısa link önbelleğini yükler"""
+        if self.redirect_cache is None or self.redirect_cache.path != self._state_file('redirects.jsonl'):
+            self.redirect_cache = RedirectCache(self._state_file('redirects.jsonl'))
+        return self.redirect_cache
+
+    def _count_short_link(self, outcome):
+        with self.stats_lock:
+            counters = self.download_stats.get('short_links')
+            if counters is not None:
+                counters[outcome] += 1
+
+    def _resolve_short_link(self, url):
+        """Kısa linki (pin.it, fb.watch, t.co) yönlendirme önbelleği üzerinden hedef URL'ye çevirir"""
+        if not self._is_short_link(url):
+            return url
+        key = self._canonical_url(url)
+        cache = self._get_redirect_cache()
+        target = cache.get(key)
+        if target is not None:
+            self._count_short_link('cached')
+            return target
+        try:
+            host = self._url_host(url)
+            response = self._http_session(host).head(key, allow_redirects=True, timeout=10)
+            target = self._canonical_url(response.url)
+        except Exception:
+            self._count_short_link('failed')
+            return url
+        if target == key:
+            self._count_short_link('failed')
+            return url
+        cache.put(key, target)
+        self._count_short_link('resolved')
+        return target
+
+    def _resolve_urls(self, urls):
+        """Girdi URL'lerini sırası korunarak kanonik hale getirir; kısa linkler sınırlı havuzda paralel çözülür"""
+        if self.resolve_workers <= 0:
+            for url in urls:
+                if url.strip():
+                    yield self._canonical_url(self._resolve_short_link(url.strip()))
+            return
+        # Sıra korunur: en öndeki link çözülene kadar arkadakiler havuzda beklemeden çözülür
+        window = deque()
+        in_flight = {}
+
+        def settle(head):
+            if isinstance(head, str):
+                return self._canonical_url(head)
+            key, future = head
+            # Sonucu verilen link sözlükten düşülür; sözlük pencereden büyümez
+            if in_flight.get(key) is future:
+                del in_flight[key]
+            return self._canonical_url(future.result())
+
+        with ThreadPoolExecutor(max_workers=self.resolve_workers, thread_name_prefix='resolve') as executor:
+            for url in urls:
+                url = url.strip()
+                if not url:
+                    continue
+                if self._is_short_link(url):
+                    # Aynı kısa link pencere içinde tekrar gelirse bekleyen çözüm paylaşılır
+                    key = self._canonical_url(url)
+                    if key not in in_flight:
+                        in_flight[key] = executor.submit(self._resolve_short_link, url)
+                    window.append((key, in_flight[key]))
+                else:
+                    window.append(url)
+                while window and (len(window) > self.resolve_workers * 4
+                                  or isinstance(window[0], str) or window[0][1].done()):
+                    yield settle(window.popleft())
+                if self.batch_control.stopping:
+                    break
+            while window and not self.batch_control.stopping:
+                yield settle(window.popleft())
+            for pending in window:
+                if not isinstance(pending, str):
+                    pending[1].cancel()
+
+    def _new_ydl(self, ydl_opts, host=None):
+        """Bağlantı bütçesini paylaşan, ek extractor'ları öne alan YoutubeDL örneği oluşturur"""
+        if self._ydl_class is None:
+            self._ydl_class = _build_segmented_ydl_class()
+        ydl = self._ydl_class(ydl_opts, auto_init=False)
+        for ie in self.extra_extractors:
+            ydl.add_info_extractor(ie())
+        ydl.add_default_info_extractors()
+        ydl.connection_budget = self.connection_budget
+        ydl.segment_options = {'max_segments': self.max_segments, 'min_size': self.segment_min_size}
+        ydl.bandwidth_limiter = self.bandwidth
+        ydl.bandwidth_host = host
+        ydl.batch_control = self.batch_control
+        _track_child_processes()
+        return ydl
+
+    @contextlib.contextmanager
+    def _ydl_context(self, ydl_opts, host=None, job=None):
+        """İş ayarlarıyla (yalnızca yt-dlp'nin genel params'ı) kurulan YoutubeDL verir; iş bitince kapatılır"""
+        ydl = self._new_ydl(ydl_opts, host=host)
+        ydl.job_key = job
+        try:
+            yield ydl
+        finally:
+            ydl.close()
+
+    def _http_session(self, host):
+        """Host başına bağlantı havuzlu, paylaşılan requests oturumu döndürür"""
+        with self._http_sessions_lock:
+            session = self._http_sessions.get(host)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers_cap)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                self._http_sessions[host] = session
+            return session
+
+    def _base_ydl_opts(self, url):
+        """Probe ve indirme için ortak yt-dlp ağ ayarlarını döndürür"""
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'no_color': True,
+            'noprogress': True,
+            'nocheckcertificate': True,
+            'prefer_insecure': False,
+            'socket_timeout': 30,
+            'retries': 5,
+            'fragment_retries': 5,
+            'logger': self._create_logger(),
+            'http_headers': {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            },
+        }
+
+        if 'pinterest.com' in url.lower():
+            ydl_opts.update({
+                'socket_timeout': 60,
+                'retries': 10,
+                'fragment_retries': 10,
+                'skip_unavailable_fragments': True,
+                'http_headers': {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                    'Accept-Language': 'en-US,en;q=0.5',
+                    'Referer': 'https://www.pinterest.com/',
+                }
+            })
+
+        return ydl_opts
+
+    def _get_info_cache(self):
+        """Kalıcı metadata önbelleğini yükler"""
+        if self.disk_info_cache is None or self.disk_info_cache.path != self._state_file('info_cache'):
+            self.disk_info_cache = InfoCache(self._state_file('info_cache'), self.info_cache_max_bytes)
+        self.disk_info_cache.ttls = self.info_cache_ttls
+        self.disk_info_cache.max_bytes = self.info_cache_max_bytes
+        return self.disk_info_cache
+
+    def _info_cache_key(self, url):
+        """Önbellek anahtarı: extractor kimliği + normalize URL"""
+        ie = self._match_extractor(url)
+        return f"{ie.ie_key() if ie else 'Generic'} {self._normalize_url(url)}"
+
+    def _url_expiry(self, info):
+        """Format URL'lerindeki 'expire' parametresinden en erken bitiş zamanı (yoksa None)"""
+        expires = None
+        for fmt in info.get('formats') or []:
+            for name, value in parse_qsl(urlparse(fmt.get('url') or '').query):
+                if name == 'expire' and value.isdigit():
+                    # Stream URL'si geçersiz olmadan 5 dk önce yenilenir
+                    expires = min(expires or int(value) - 300, int(value) - 300)
+        return expires
+
+    def _remember_info(self, key, entry):
+        """Bellek önbelleğine ekler; sınır aşılınca en uzun süredir kullanılmayan kayıt düşer"""
+        with self.info_cache_lock:
+            self.info_cache[key] = entry
+            self.info_cache.move_to_end(key)
+            while len(self.info_cache) > self.info_cache_entries:
+                self.info_cache.popitem(last=False)
+
+    def _extract_info(self, url, allow_stale=False):
+        """URL metadata'sını bir kez çıkarır; bellek ve disk önbelleğinden süresi dolmamışsa döndürür
+
+        allow_stale: yalnızca başlık, süre, boyut gibi sabit alanlar gerekiyorsa süresi dolmuş kayıt da kullanılır
+        """
+        key = url.strip()
+        with self.info_cache_lock:
+            cached = self.info_cache.get(key)
+            if cached is not None:
+                self.info_cache.move_to_end(key)
+        if cached is not None:
+            cache = self._get_info_cache() if self.use_info_cache else None
+            fresh = time.time() < (cache.expires(cached) if cache else float('inf'))
+            if fresh or allow_stale:
+                if cache:
+                    cache.count_hit(fresh)
+                return cached['info']
+
+        cache_key = None
+        if self.use_info_cache:
+            cache_key = self._info_cache_key(key)
+            entry = self._get_info_cache().get(cache_key, allow_stale, self.info_cache_stale_ttl)
+            if entry is not None:
+                self._remember_info(key, entry)
+                return entry['info']
+
+        url = self._resolve_short_link(url)
+
+        ydl_opts = self._base_ydl_opts(url)
+        ydl_opts['extract_flat'] = False
 
-    def _resolve_pinterest_url(self, url):
-        """Pinterest kısa linkini uzun URL'ye dönüştürür"""
-        try:
-            import requests
-            if 'pin.it' in url:
-                response = requests.head(url, allow_redirects=True, timeout=10)
-                return response.url
-            return url
-        except:
-            return url
+        with self._ydl_context(ydl_opts, host=self._host_key(url), job=key) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            # Algılanamamış playlist'lerin girdileri burada açılmaz; indirme aşamasında yt-dlp işler
+            if not self._is_playlist_info(info):
+                info = ydl.process_ie_result(info, download=False)
+            # İndirme sırasında yeniden işlenebilmesi için özel alanları temizle ('entries' de atılır)
+            info = ydl.sanitize_info(info, remove_private_keys=True)
+
+        entry = {'fetched': time.time(), 'extractor': info.get('extractor_key'),
+                 'url_expires': self._url_expiry(info), 'info': info}
+        self._remember_info(key, entry)
+        if cache_key is not None:
+            try:
+                self._get_info_cache().put(cache_key, entry)
+            except (OSError, TypeError, ValueError):
+                pass
+        return info
+
+    @staticmethod
+    def _is_playlist_info(info):
+        """Çıkarım sonucu tek medya yerine playlist/çoklu video ise True döner"""
+        return info.get('_type', 'video') in ('playlist', 'multi_video')
 
     def _get_video_info(self, url):
         """Video bilgilerini alır"""
         c = self.colors
         try:
-            import yt_dlp
-            
-            if 'pin.it' in url.lower():
-                url = self._resolve_pinterest_url(url)
-            
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-                'no_color': True,
-                'noprogress': True,
+            info = self._extract_info(url, allow_stale=True)
+            formats = info.get('formats', []) or []
+            return {
+                'title': info.get('title', 'Unknown Title'),
+                'duration': info.get('duration', 0),
+                'uploader': info.get('uploader', 'Unknown Uploader'),
+                'formats': len(formats),
+                'has_video': any(f.get('vcodec', 'none') != 'none' for f in formats),
+                'has_audio': any(f.get('acodec', 'none') != 'none' for f in formats)
             }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                formats = info.get('formats', []) or []
-                return {
-                    'title': info.get('title', 'Unknown Title'),
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown Uploader'),
-                    'formats': len(formats),
-                    'has_video': any(f.get('vcodec', 'none') != 'none' for f in formats),
-                    'has_audio': any(f.get('acodec', 'none') != 'none' for f in formats)
-                }
         except Exception as e:
             return None
 
-    def _download_media(self, url, quality_format, is_audio_only=False, worker_id=0):
+    def _fallback_formats(self, is_audio_only=False, is_pinterest=False):
+        """Yedek format sıralamasını döndürür"""
+        if is_audio_only:
+            return ['bestaudio', 'best']
+        if is_pinterest:
+            return [
+                'best',
+                'best[height<=1080]',
+                'best[height<=720]',
+                'best[height<=480]',
+                'best[height<=360]',
+                'best[vcodec!=none]',
+                'best[acodec!=none]'
+            ]
+        return [
+            'best[height<=1080]',
+            'best[height<=720]',
+            'best[height<=480]',
+            'best[height<=360]',
+            'best'
+        ]
+
+    def _is_pinterest(self, url, info):
+        return 'pinterest' in (info.get('extractor_key') or '').lower() or 'pinterest.com' in url.lower()
+
+    def _job_format_selector(self, url, info, quality_format, is_audio_only=False):
+        """İşin kalite ve platformuna göre yt-dlp format ifadesini döndürür"""
+        if is_audio_only:
+            return 'bestaudio/best'
+        if self._is_pinterest(url, info):
+            return 'best[ext=mp4]/best[ext=webm]/best'
+        return quality_format
+
+    def _estimate_job_size(self, info, chosen_formats):
+        """Seçilen formatların filesize/filesize_approx değerinden iş boyutunu (byte) tahmin eder"""
+        total = 0
+        for chosen in chosen_formats:
+            for fmt in chosen.get('requested_formats') or [chosen]:
+                size = fmt.get('filesize') or fmt.get('filesize_approx')
+                if not size and fmt.get('tbr') and info.get('duration'):
+                    size = fmt['tbr'] * 125 * info['duration']  # kbit/s -> byte
+                total += size or 0
+        return int(total)
+
+    def _job_priority(self, size):
+        """Zamanlayıcı önceliği: küçük değer önce indirilir"""
+        if self.job_order == 'longest':
+            return -size
+        if self.job_order == 'shortest':
+            return size
+        return 0
+
+    def _probe_worker(self, probe_queue, scheduler, format_selector, is_audio_only, stage_stats):
+        """Probe aşaması: metadata'yı önceden çıkarır, boyutu tahmin eder ve işi öncelikle kuyruğa koyar"""
+        while True:
+            job = probe_queue.get()
+            if job is None:
+                return
+            if self.batch_control.stopping:
+                scheduler.discard()
+                continue
+            started = time.time()
+            size = 0
+            try:
+                # Boyut tahmini için süresi dolmuş önbellek kaydı yeterlidir; indirme taze bilgi alır
+                info = self._extract_info(job['url'], allow_stale=True)
+                _, chosen = self._resolve_format(
+                    info, self._job_format_selector(job['url'], info, format_selector, is_audio_only),
+                    is_audio_only, self._is_pinterest(job['url'], info))
+                size = self._estimate_job_size(info, chosen)
+            except Exception:
+                pass  # Hata indirme aşamasında yeniden denenir ve orada raporlanır
+            job['estimated_size'] = size
+            job['priority'] = self._job_priority(size)
+            scheduler.put(job['host'], job, priority=job['priority'])
+            with self.stats_lock:
+                stage_stats['busy'] += time.time() - started
+                stage_stats['jobs'] += 1
+
+    def _resolve_format(self, info, format_selector, is_audio_only=False, is_pinterest=False, exclude=()):
+        """Probe edilen format listesinden en uygun formatı yerel olarak seçer (exclude: daha önce başarısız olanlar)"""
+        formats = info.get('formats') or []
+        if not formats:
+            # Playlist gibi format listesi olmayan sonuçlarda seçim yt-dlp'ye kalır
+            return format_selector, []
+
+        can_merge = self._get_ffmpeg_path() is not None
+        candidates = [format_selector] + self._fallback_formats(is_audio_only, is_pinterest)
+
+        with self._ydl_context({'quiet': True, 'no_warnings': True, 'logger': self._create_logger()}) as ydl:
+            for spec in candidates:
+                try:
+                    # Seçim bağlamını yt-dlp kendisi kurar; process_video_result ile aynı sonucu verir
+                    chosen = ydl._select_formats(formats, ydl.build_format_selector(spec))
+                except Exception:
+                    continue
+                if not chosen:
+                    continue
+                # ffmpeg yoksa birleştirme gerektiren seçimler uygulanamaz
+                if not can_merge and any(f.get('requested_formats') for f in chosen):
+                    continue
+                if any(f.get('has_drm') for f in chosen):
+                    continue
+                selected = ','.join(f['format_id'] for f in chosen)
+                if selected in exclude:
+                    continue
+                return selected, chosen
+
+        return None, []
+
+    def _codec_family(self, codec):
+        """yt-dlp codec dizesini codec ailesine indirger"""
+        codec = (codec or '').lower()
+        if not codec:
+            return None
+        if codec == 'none':
+            return 'none'
+        families = {
+            'h264': ('avc1', 'avc3', 'h264'),
+            'h265': ('hvc1', 'hev1', 'h265', 'hevc'),
+            'av1': ('av01', 'av1'),
+            'vp9': ('vp09', 'vp9'),
+            'vp8': ('vp8',),
+            'aac': ('mp4a', 'aac'),
+            'mp3': ('mp3',),
+            'opus': ('opus',),
+            'vorbis': ('vorbis',),
+            'ac3': ('ac-3', 'ac3'),
+            'eac3': ('ec-3', 'eac3'),
+        }
+        for family, prefixes in families.items():
+            if codec.startswith(prefixes):
+                return family
+        return codec
+
+    def _plan_postprocess(self, chosen_formats, is_audio_only=False):
+        """Seçilen formatın codec'lerine göre remux/transcode yolunu belirler"""
+        base_args = ['-loglevel', 'error']
+
+        if is_audio_only:
+            return 'extract-audio', {
+                'postprocessors': [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                    'preferredquality': '320',
+                }],
+                'postprocessor_args': base_args,
+            }
+
+        streams = []
+        for fmt in chosen_formats:
+            streams.extend(fmt.get('requested_formats') or [fmt])
+        exts = {(f.get('ext') or '').lower() for f in streams}
+        vcodecs = {self._codec_family(f.get('vcodec')) for f in streams} - {'none'}
+        acodecs = {self._codec_family(f.get('acodec')) for f in streams} - {'none'}
+        merged = len(streams) > 1
+
+        # Codec bilgisi olmayan tek mp4 dosyası olduğu gibi kabul edilir
+        unknown_mp4 = not merged and exts == {'mp4'}
+        # Format listesi bilinmiyorsa (playlist, açılmamış formatlar) pahalı transcode yerine remux denenir
+        video_ok = all(v in self.mp4_copy_codecs['video'] or (v is None and unknown_mp4) for v in vcodecs)
+        audio_ok = all(a in self.mp4_copy_codecs['audio'] or (a is None and unknown_mp4) for a in acodecs)
+
+        opts = {
+            'prefer_ffmpeg': True,
+            'keepvideo': False,
+            'ffmpeg_location': self._get_ffmpeg_path(),
+        }
+
+        if video_ok and audio_ok:
+            # Hızlı yol: codec'ler mp4 ile uyumlu, sadece stream copy
+            mode = 'direct' if not merged and exts == {'mp4'} else 'remux'
+            opts.update({
+                'postprocessors': [
+                    {'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'},
+                    {'key': 'FFmpegMetadata'},
+                ],
+                'merge_output_format': 'mp4',
+                'postprocessor_args': {'default': base_args},
+            })
+            return mode, opts
+
+        if video_ok:
+            mode = 'audio-transcode'
+            convert_args = ['-c:v', 'copy', '-c:a', 'aac']
+        else:
+            mode = 'transcode'
+            convert_args = ['-c:v', 'libx264', '-c:a', 'aac', '-strict', '-2']
+
+        # Birleştirme her zaman stream copy; kodlama sadece dönüştürücüde yapılır
+        opts.update({
+            'postprocessors': [
+                {'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'},
+                {'key': 'FFmpegMetadata'},
+            ],
+            'merge_output_format': 'mkv',
+            'postprocessor_args': {
+                'videoconvertor': convert_args + base_args,
+                'default': base_args,
+            },
+        })
+        return mode, opts
+
+    def _error_chain(self, error):
+        """Bir hatayı ve onu tetikleyen alt hataları sırayla döndürür"""
+        seen = set()
+        pending = [error]
+        while pending:
+            error = pending.pop(0)
+            if error is None or id(error) in seen:
+                continue
+            seen.add(id(error))
+            yield error
+            exc_info = getattr(error, 'exc_info', None)
+            # exc_info, cause ve __context__ farklı hatalara işaret edebilir; hepsi izlenir
+            pending.extend((exc_info[1] if exc_info else None, getattr(error, 'cause', None),
+                            error.__cause__, error.__context__))
+
+    def _is_transport_error(self, error):
+        """Hatanın yeniden denenebilir bir ağ hatası olup olmadığını belirler"""
+        import socket
+        import http.client
+        from yt_dlp.networking.exceptions import TransportError, HTTPError
+        from yt_dlp.utils import ContentTooShortError
+
+        for err in self._error_chain(error):
+            if isinstance(err, HTTPError):
+                return err.status >= 500 or err.status == 408
+            if isinstance(err, (TransportError, ContentTooShortError, socket.timeout,
+                                ConnectionError, http.client.IncompleteRead)):
+                return True
+        return False
+
+    def _is_throttle_error(self, error):
+        """Sunucunun hız sınırlaması (429) yanıtı verip vermediğini belirler"""
+        from yt_dlp.networking.exceptions import HTTPError
+
+        # 503 (geçici sunucu hatası) hem HTTPError hem mesaj yolunda 'transient' sayılır
+        for err in self._error_chain(error):
+            if isinstance(err, HTTPError) and err.status == 429:
+                return True
+            if 'HTTP Error 429' in str(err):
+                return True
+        return False
+
+    def _classify_error(self, error, downloading=False):
+        """Hatayı 'permanent', 'throttled', 'transient' veya 'format' sınıfına ayırır"""
+        kind = self._error_kind(error, downloading)
+        return 'transient' if kind == 'unknown' else kind
+
+    def _error_kind(self, error, downloading=False):
+        """Hata sınıfını döndürür; hiçbir işarete uymayan hata 'unknown' olur (geçici sayılır, daha az denenir)"""
+        from yt_dlp.networking.exceptions import HTTPError
+        from yt_dlp.utils import GeoRestrictedError, UnsupportedError, PostProcessingError
+
+        chain = list(self._error_chain(error))
+        text = ' '.join(str(err) for err in chain).lower()
+        if (any(isinstance(err, (GeoRestrictedError, UnsupportedError)) for err in chain)
+                or any(isinstance(err, HTTPError) and err.status in (404, 410) for err in chain)
+                or any(marker in text for marker in self.permanent_error_markers)):
+            return 'permanent'
+        if self._is_throttle_error(error) or 'too many requests' in text:
+            return 'throttled'
+        if ('requested format is not available' in text or 'no viable format' in text
+                or any(isinstance(err, PostProcessingError) for err in chain)):
+            return 'format'
+        # Çıkarım başarılıyken stream URL'si reddedildiyse (süresi dolmuş/imzalı URL) başka format denenir
+        if downloading and any(isinstance(err, HTTPError) and err.status == 403 for err in chain):
+            return 'format'
+        if self._is_transport_error(error) or any(marker in text for marker in self.transient_error_markers):
+            return 'transient'
+        return 'unknown'
+
+    def _is_format_unavailable(self, error, downloading=False):
+        """Hata, önbellekteki format listesinin geçersiz olduğunu mu gösteriyor (seçilemeyen format veya reddedilen stream URL'si)"""
+        from yt_dlp.networking.exceptions import HTTPError
+
+        chain = list(self._error_chain(error))
+        text = ' '.join(str(err) for err in chain).lower()
+        if 'requested format is not available' in text or 'no viable format' in text:
+            return True
+        return downloading and any(isinstance(err, HTTPError) and err.status == 403 for err in chain)
+
+    def _retry_delay(self, category, attempts):
+        """Sınıfın politikasına göre bekleme süresi (jitter'lı üstel geri çekilme); deneme hakkı bittiyse None"""
+        policy = self.retry_policy.get(category)
+        attempt = attempts.get(category, 0)
+        if not policy or attempt >= policy['retries']:
+            return None
+        attempts[category] = attempt + 1
+        delay = min(policy['cap'], policy['base'] * 2 ** attempt)
+        # Aynı anda düşen işler aynı anda geri dönmesin
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _forget_info(self, url):
+        """URL'nin önbellekteki metadata'sını siler; sonraki deneme taze stream URL'leri alır"""
+        key = url.strip()
+        with self.info_cache_lock:
+            self.info_cache.pop(key, None)
+        if self.use_info_cache:
+            self._get_info_cache().delete(self._info_cache_key(key))
+
+    def _download_media(self, url, quality_format, is_audio_only=False, worker_id=0, postprocess_queue=None, phases=None, acquire_slot=True):
         """Medyayı indirir - Thread-safe"""
         c = self.colors
-        download_info = {'success': False, 'filename': '', 'size': 0, 'speed': '', 'time': '', 'worker_id': worker_id}
+        download_info = {'success': False, 'url': url, 'filename': '', 'size': 0, 'speed': '', 'time': '', 'format': '', 'postprocess': '', 'worker_id': worker_id}
+        connection_budget = self.connection_budget
+        has_connection = False
+        progress_hook = None
+        job_metrics = self._new_job_metrics(url, worker_id, phases)
+        timestamps = job_metrics['timestamps']
         
         try:
-            # Semaphore ile concurrent download kontrolü
-            self.download_semaphore.acquire()
+            # Semaphore ile concurrent download kontrolü (batch modunda slotu worker döngüsü tutar)
+            if acquire_slot:
+                self.download_semaphore.acquire()
+                timestamps['slot_acquired'] = time.time()
+                if phases is not None:
+                    phases['slot_acquired'] = timestamps['slot_acquired']
+            # Temel bağlantı; segment ve parça bağlantıları aynı bütçeden ek olarak alınır
+            connection_budget.acquire()
+            has_connection = True
             
             import yt_dlp
-            from tqdm import tqdm
             import time as time_module
             
             start_time = time_module.time()
             
-            if 'pin.it' in url.lower():
-                url = self._resolve_pinterest_url(url)
-            
             if 'spotify.com' in url.lower():
-                return False
+                raise ValueError('DRM protected content')
             
-            is_pinterest = 'pinterest.com' in url.lower()
+            # Probe sonucu önbellekten gelir; aynı URL tekrar çıkarılmaz
+            self._journal_state(url, 'extracting')
+            timestamps['extract_start'] = time.time()
+            info = self._extract_info(url)
+            timestamps['extract_end'] = time.time()
+            is_pinterest = self._is_pinterest(url, info)
             
-            if is_audio_only:
-                output_template = f'{self.downloads_path}/%(title)s.%(ext)s'
-                format_selector = 'bestaudio/best'
-            else:
-                output_template = f'{self.downloads_path}/%(title)s.%(ext)s'
-                format_selector = quality_format
+            output_template = f'{self.downloads_path}/%(title)s.%(ext)s'
+
+            # Format seçimi ağ erişimi olmadan probe edilen listeden yapılır
+            format_selector, chosen_formats = self._resolve_format(
+                info, self._job_format_selector(url, info, quality_format, is_audio_only), is_audio_only, is_pinterest,
+                exclude=phases.get('exclude_formats', ()) if phases else ())
+            if not format_selector:
+                raise ValueError('No viable format available')
+            download_info['format'] = format_selector
+            job_metrics['format'] = format_selector
+            self._journal_state(url, 'downloading', format=format_selector)
+
+            concurrency = self.download_semaphore
+            board = self.progress_board
 
             class ProgressHook:
+                """yt-dlp geri çağrılarını panoya ve throughput ölçümüne sayaç olarak aktarır"""
                 def __init__(self):
-                    self.pbar = None
+                    self.slot = board.open(f'W{worker_id}', info.get('title') or url)
                     self.total_bytes = 0
+                    self.file_bytes = 0
+                    self.last_downloaded = 0
                     self.final_filename = ''
-                    self.last_update = 0
 
                 def __call__(self, d):
                     if d['status'] == 'downloading':
-                        if self.pbar is None:
-                            total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-                            if total > 0:
-                                self.total_bytes = total
-                                self.pbar = tqdm(
-                                    total=total, 
-                                    unit='B', 
-                                    unit_scale=True,
-                                    desc=f'{c["info"]}[W{worker_id}] ⬇️{c["reset"]}',
-                                    bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}',
-                                    ncols=80,
-                                    position=worker_id
-                                )
-                        
-                        if self.pbar and 'downloaded_bytes' in d:
-                            downloaded = d['downloaded_bytes']
-                            if self.pbar.n < downloaded:
-                                self.pbar.update(downloaded - self.pbar.n)
+                        if 'transfer_start' not in timestamps:
+                            timestamps['transfer_start'] = time_module.time()
+                        total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                        if total > 0:
+                            self.file_bytes = total
+                        downloaded = d.get('downloaded_bytes')
+                        if downloaded is not None:
+                            # Adaptif eşzamanlılık için toplam throughput örneği
+                            if downloaded > self.last_downloaded:
+                                concurrency.record_bytes(downloaded - self.last_downloaded)
+                                self.last_downloaded = downloaded
+                            board.update(self.slot, downloaded, total)
                     
                     elif d['status'] == 'finished':
-                        if self.pbar:
-                            self.pbar.close()
+                        # Birleştirilen formatlarda her dosyanın boyutu toplanır
+                        size = self.file_bytes or d.get('total_bytes') or 0
+                        board.file_finished(self.slot, size)
+                        timestamps.setdefault('transfer_start', time_module.time())
+                        timestamps['transfer_end'] = time_module.time()
+                        self.total_bytes += size
+                        self.file_bytes = 0
+                        self.last_downloaded = 0
                         self.final_filename = d.get('filename', '')
                         download_info['filename'] = self.final_filename
                         download_info['size'] = self.total_bytes
 
-            ydl_opts = {
+                def close(self):
+                    board.close(self.slot)
+
+            ydl_opts = self._base_ydl_opts(info.get('webpage_url') or url)
+            ydl_opts.update({
                 'format': format_selector,
                 'outtmpl': output_template,
-                'progress_hooks': [ProgressHook()],
                 'writesubtitles': False,
                 'writeautomaticsub': False,
                 'ignoreerrors': False,
-                'quiet': True,
-                'no_warnings': True,
-                'nocheckcertificate': True,
-                'prefer_insecure': False,
-                'socket_timeout': 30,
-                'retries': 5,
-                'fragment_retries': 5,
-                'logger': self._create_logger(),
-                'postprocessor_args': ['-loglevel', 'error'],
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                },
-            }
-
-            if is_pinterest:
-                ydl_opts.update({
-                    'format': 'best[ext=mp4]/best[ext=webm]/best',
-                    'socket_timeout': 60,
-                    'retries': 10,
-                    'fragment_retries': 10,
-                    'skip_unavailable_fragments': True,
-                    'http_headers': {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Referer': 'https://www.pinterest.com/',
-                    }
-                })
+                'continuedl': True,  # Yeniden başlatılan batch .part dosyalarından devam eder
+                'concurrent_fragment_downloads': self.fragment_workers,  # HLS/DASH parça havuzu üst sınırı
+            })
 
-            if is_audio_only:
-                ydl_opts.update({
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio',
-                        'preferredcodec': 'mp3',
-                        'preferredquality': '320',
-                    }],
-                })
-            else:
-                ydl_opts.update({
-                    'postprocessors': [
-                        {
-                            'key': 'FFmpegVideoConvertor',
-                            'preferedformat': 'mp4',
-                        },
-                        {
-                            'key': 'FFmpegMetadata',
-                        }
-                    ],
-                    'merge_output_format': 'mp4',
-                    'prefer_ffmpeg': True,
-                    'keepvideo': False,
-                    'ffmpeg_location': self._get_ffmpeg_path(),
-                    'postprocessor_args': ['-c:v', 'libx264', '-c:a', 'aac', '-strict', '-2'],
-                })
+            # Codec'ler uyumluysa stream copy, değilse transcode
+            pp_mode, pp_opts = self._plan_postprocess(chosen_formats, is_audio_only)
+            ydl_opts.update(pp_opts)
+            download_info['postprocess'] = pp_mode
+            job_metrics['postprocess'] = pp_mode
 
             progress_hook = ProgressHook()
             ydl_opts['progress_hooks'] = [progress_hook]
+            ydl_opts['postprocessor_hooks'] = [self._postprocessor_hook(job_metrics)]
+
+            # Pipeline modunda ffmpeg adımları ayrı CPU havuzuna bırakılır (birleştirme burada kalır)
+            defer_postprocess = postprocess_queue is not None and bool(info.get('formats'))
+            if defer_postprocess:
+                ydl_opts['postprocessors'] = []
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-                
+            # Hata olursa iş sınıfına göre kuyruğa geri döner; .part dosyasından devam edilir
+            with self._ydl_context(ydl_opts, host=job_metrics['host'], job=url) as ydl:
+                if self._is_playlist_info(info):
+                    # Önbellekteki kayıtta girdi listesi tutulmaz; playlist baştan çıkarılıp indirilir
+                    result = ydl.extract_info(info.get('webpage_url') or url, download=True)
+                else:
+                    result = ydl.process_ie_result(copy.deepcopy(info), download=True)
+
             end_time = time_module.time()
             elapsed = end_time - start_time
             
             if progress_hook.total_bytes > 0:
                 speed_mbps = (progress_hook.total_bytes / (1024 * 1024)) / elapsed if elapsed > 0 else 0
                 download_info['speed'] = f"{speed_mbps:.2f} MB/s"
-                download_info['time'] = f"{int(elapsed // 60)}m {int(elapsed % 60)}s" if elapsed >= 60 else f"{elapsed:.1f}s"
-            
-            download_info['success'] = True
-            
-            # Thread-safe stats update
-            with self.stats_lock:
-                self.download_stats['successful'] += 1
-                self.download_stats['total_size'] += progress_hook.total_bytes
-                self.download_stats['total_time'] += elapsed
-                self.download_stats['downloads'].append(download_info)
+
+            if defer_postprocess:
+                items = [self._postprocess_item(result, requested)
+                         for requested in result.get('requested_downloads') or []]
+                self._journal_state(url, 'postprocessing', path=items[0].get('filepath') if items else '')
+                job_metrics['bytes'] = progress_hook.total_bytes
+                timestamps['postprocess_enqueued'] = time_module.time()
+                postprocess_queue.put({
+                    'metrics': job_metrics,
+                    'download_info': download_info,
+                    'items': items,
+                    'pp_opts': pp_opts,
+                    'source_url': url,
+                    'url': info.get('webpage_url') or url,
+                    'archive_info': {'id': info.get('id'), 'extractor_key': info.get('extractor_key')},
+                    'catalog_info': self._catalog_info(url, result),
+                    'start_time': start_time,
+                    'total_bytes': progress_hook.total_bytes,
+                    'enqueued': time_module.time(),
+                })
+                return True
             
+            self._record_success(download_info, progress_hook.total_bytes, elapsed)
+            self._archive_record(url, info)
+            final_path = ((result.get('requested_downloads') or [{}])[-1].get('filepath')
+                          or download_info['filename'])
+            self._catalog_record(final_path, self._catalog_info(url, result))
+            self._journal_state(url, 'done', path=download_info['filename'], **self._result_fields(download_info))
+            job_metrics['bytes'] = progress_hook.total_bytes
+            self._finish_job_metrics(job_metrics, 'done')
             return True
 
         except Exception as e:
-            with self.stats_lock:
-                self.download_stats['failed'] += 1
+            stopped = self._stop_state(url)
+            if stopped:
+                # .part/.segments dosyaları korunur; iş --resume ile kaldığı yerden sürer
+                self._finish_job_metrics(job_metrics, stopped)
+                self._journal_state(url, stopped)
+                self._record_stopped(url, stopped)
+                return False
+            kind = self._error_kind(e, downloading='extract_end' in timestamps)
+            category = 'transient' if kind == 'unknown' else kind
+            job_metrics['error_category'] = category
+            if category in ('transient', 'throttled'):
+                self.download_semaphore.record_error(throttled=category == 'throttled')
+            if phases is not None:
+                phases['error_category'] = category
+                delay = self._retry_delay(kind, phases['attempts']) if 'attempts' in phases else None
+                if delay is not None:
+                    if category == 'format':
+                        if download_info['format']:
+                            phases['exclude_formats'].append(download_info['format'])
+                        # Son işlem hatasında metadata geçerlidir; yalnızca format listesi bayatsa yeniden çıkarılır
+                        if self._is_format_unavailable(e, downloading='extract_end' in timestamps):
+                            self._forget_info(url)
+                    phases['retry_after'] = delay
+                    # Metrik kaydı iş sonuçlanınca bir kez yazılır; ara denemeler yalnızca iş günlüğüne girer
+                    self._journal_state(url, 'retrying', error=str(e)[:300], category=category, delay=round(delay, 1))
+                    self._record_retry(category)
+                    return False
+            self._finish_job_metrics(job_metrics, 'failed', e)
+            self._journal_state(url, 'failed', error=str(e)[:300], category=category)
+            self._record_failure(url, e, category)
             return False
         finally:
-            self.download_semaphore.release()
+            if progress_hook is not None:
+                progress_hook.close()
+            if has_connection:
+                connection_budget.release()
+            if acquire_slot:
+                if phases is not None:
+                    phases['slot_released'] = time.time()
+                self.download_semaphore.release()
 
-    def _fallback_download(self, url, is_audio_only=False, worker_id=0):
-        """Alternatif kalitelerde indirme dener"""
-        c = self.colors
-        is_pinterest = 'pinterest.com' in url.lower()
-        
-        if is_audio_only:
-            fallback_formats = ['bestaudio', 'best']
-        else:
-            if is_pinterest:
-                fallback_formats = [
-                    'best',
-                    'best[height<=1080]',
-                    'best[height<=720]',
-                    'best[height<=480]',
-                    'best[height<=360]',
-                    'best[vcodec!=none]',
-                    'best[acodec!=none]'
-                ]
-            else:
-                fallback_formats = [
-                    'best[height<=1080]',
-                    'best[height<=720]',
-                    'best[height<=480]',
-                    'best[height<=360]',
-                    'best'
-                ]
+    def _get_metrics(self):
+        """Metrik kaydediciyi ilk kullanımda oluşturur (isteğe bağlı HTTP uç noktasıyla)"""
+        if self.metrics is None:
+            self.metrics = MetricsRecorder(self._state_file('metrics.jsonl'), textfile=self._state_file('metrics.prom'))
+            if self.metrics_port is not None:
+                self.metrics.serve(self.metrics_port)
+        return self.metrics
 
-        for fmt in fallback_formats:
-            if self._download_media(url, fmt, is_audio_only, worker_id):
-                return True
+    def _new_job_metrics(self, url, worker_id, phases=None):
+        """Bir indirme işinin faz zaman damgalarını tutacak kaydı oluşturur"""
+        timestamps = {'started': time.time()}
+        if phases:
+            for key in ('submitted', 'slot_acquired'):
+                if key in phases:
+                    timestamps[key] = phases[key]
+        return {
+            'url': url,
+            'batch_id': self.batch_id,
+            'worker_id': worker_id,
+            'host': self._host_key(url),
+            'format': '',
+            'postprocess': '',
+            'postprocessors': [],
+            'bytes': 0,
+            # Bu denemeye kadar yapılan yeniden deneme sayısı (tüm hata sınıfları)
+            'retries': sum((phases or {}).get('attempts', {}).values()),
+            'status': None,
+            'error_class': None,
+            'error': None,
+            'timestamps': timestamps,
+            'durations': {'merge': 0.0, 'postprocess': 0.0},
+        }
+
+    def _postprocessor_hook(self, job_metrics):
+        """yt-dlp son işlem adımlarını birleştirme ve ffmpeg süresi olarak ölçen hook"""
+        started = {}
+
+        def hook(d):
+            name = d.get('postprocessor') or 'unknown'
+            if d['status'] == 'started':
+                started[name] = time.time()
+            elif d['status'] == 'finished' and name in started:
+                phase = 'merge' if name == 'Merger' else 'postprocess'
+                job_metrics['durations'][phase] += time.time() - started.pop(name)
+                job_metrics['postprocessors'].append(name)
+        return hook
+
+    def _finish_job_metrics(self, job_metrics, status, error=None):
+        """Faz sürelerini hesaplar ve işi metrik günlüğüne yazar"""
+        ts = job_metrics['timestamps']
+        ts['finished'] = time.time()
+        job_metrics['status'] = status
+        if error is not None:
+            root = list(self._error_chain(error))[-1]
+            job_metrics['error_class'] = type(root).__name__
+            job_metrics['error'] = str(error)[:300]
+
+        def span(start, end):
+            # Hata anında açık kalan faz, hatanın olduğu ana kadar sayılır
+            if start not in ts:
+                return None
+            return round(max(0.0, ts.get(end, ts['finished']) - ts[start]), 3)
+
+        phases = {
+            'queue_wait': span('submitted', 'slot_acquired'),
+            'extract': span('extract_start', 'extract_end'),
+            'transfer': span('transfer_start', 'transfer_end'),
+            'merge': round(job_metrics['durations']['merge'], 3) or None,
+            'postprocess_wait': span('postprocess_enqueued', 'postprocess_start'),
+            'postprocess': round(job_metrics['durations']['postprocess'], 3) or None,
+            'total': span('submitted' if 'submitted' in ts else 'started', 'finished'),
+        }
+        record = {k: v for k, v in job_metrics.items() if k != 'durations'}
+        record['phases'] = {k: v for k, v in phases.items() if v is not None}
+        try:
+            self._get_metrics().record_job(record)
+        except OSError:
+            pass
+
+    def _record_failure(self, url, error, category=None):
+        """Başarısız indirmeyi sayar ve hata nedenini (sınıfıyla) saklar"""
+        with self.stats_lock:
+            self.download_stats['failed'] += 1
+            self.download_stats['errors'].append({'url': url, 'error': str(error)[:300], 'category': category})
+            if category:
+                failures = self.download_stats.setdefault('failure_categories', {})
+                failures[category] = failures.get(category, 0) + 1
+
+    def _record_retry(self, category):
+        """Yeniden denemeye gönderilen işi sınıfına göre sayar"""
+        with self.stats_lock:
+            retries = self.download_stats.setdefault('retries', {})
+            retries[category] = retries.get(category, 0) + 1
+
+    def _stop_state(self, url):
+        """İş batch durdurulduğu için 'interrupted', tek tek iptal edildiyse 'cancelled' döndürür"""
+        if self.batch_control.is_cancelled(url):
+            return 'cancelled'
+        if self.batch_control.stopping:
+            return 'interrupted'
+        return None
+
+    def _record_stopped(self, url, state):
+        """İptal edilen veya durdurma ile yarıda kalan işi sayar"""
+        with self.stats_lock:
+            self.download_stats[state] = self.download_stats.get(state, 0) + 1
+
+    def _record_success(self, download_info, total_bytes, elapsed):
+        """Başarılı indirmeyi istatistiklere işler"""
+        download_info['time'] = f"{int(elapsed // 60)}m {int(elapsed % 60)}s" if elapsed >= 60 else f"{elapsed:.1f}s"
+        download_info['success'] = True
         
-        return False
+        # Thread-safe stats update
+        with self.stats_lock:
+            self.download_stats['successful'] += 1
+            self.download_stats['total_size'] += total_bytes
+            self.download_stats['total_time'] += elapsed
+            self.download_stats['downloads'].append(download_info)
+            modes = self.download_stats.setdefault('postprocess_modes', {})
+            mode = download_info.get('postprocess') or 'unknown'
+            modes[mode] = modes.get(mode, 0) + 1
+
+    def _result_fields(self, download_info):
+        """İş günlüğüne 'done' satırıyla yazılan sonuç alanları"""
+        return {key: download_info.get(key) for key in ('size', 'speed', 'time', 'format', 'postprocess')}
+
+    def _postprocess_item(self, result, requested):
+        """Son işlem kuyruğuna yalnızca ffmpeg adımlarının okuduğu alanları koyar (format listesi vb. taşınmaz)"""
+        merged = dict(result, **requested)
+        fields = (
+            'filepath', 'ext', 'id', 'title', 'track', 'upload_date', 'description', 'synopsis', 'webpage_url',
+            'track_number', 'artist', 'artists', 'creator', 'creators', 'uploader', 'uploader_id', 'composer',
+            'composers', 'genre', 'genres', 'categories', 'tags', 'album', 'series', 'album_artist',
+            'album_artists', 'disc_number', 'season_number', 'episode', 'episode_id', 'episode_number',
+            'chapters', 'vcodec', 'acodec', 'language',
+        )
+        item = {key: merged[key] for key in fields if merged.get(key) is not None}
+        item.update((key, value) for key, value in merged.items() if key.startswith('meta_'))
+        if merged.get('requested_formats'):
+            # Metadata adımı akış dillerini birleştirilen formatlardan okur
+            item['requested_formats'] = [
+                {key: fmt.get(key) for key in ('vcodec', 'acodec', 'language')}
+                for fmt in merged['requested_formats']]
+        return item
+
+    def _postprocess_media(self, job):
+        """İndirilen ham dosyalara ffmpeg son işlemlerini uygular"""
+        job_metrics = job['metrics']
+        job_metrics['timestamps']['postprocess_start'] = time.time()
+        try:
+            ydl_opts = self._base_ydl_opts(job['url'])
+            ydl_opts.update(job['pp_opts'])
+            ydl_opts['postprocessor_hooks'] = [self._postprocessor_hook(job_metrics)]
+            with self._ydl_context(ydl_opts) as ydl:
+                for item in job['items']:
+                    item = ydl.post_process(item['filepath'], item)
+                    job['download_info']['filename'] = item.get('filepath', job['download_info']['filename'])
 
-    def _download_worker(self, url, quality_format, is_audio_only, worker_id):
+            self._record_success(job['download_info'], job['total_bytes'], time.time() - job['start_time'])
+            self._archive_record(job['source_url'], job['archive_info'])
+            self._catalog_record(job['download_info']['filename'], job['catalog_info'])
+            self._journal_state(job['source_url'], 'done', path=job['download_info']['filename'],
+                                **self._result_fields(job['download_info']))
+            self._finish_job_metrics(job_metrics, 'done')
+            return True
+        except Exception as e:
+            stopped = self._stop_state(job['source_url'])
+            if stopped:
+                # Ham dosyalar diskte kalır; devam edildiğinde yalnızca son işlem tekrarlanır
+                self._finish_job_metrics(job_metrics, stopped)
+                self._journal_state(job['source_url'], stopped)
+                self._record_stopped(job['source_url'], stopped)
+                return False
+            category = self._classify_error(e)
+            job_metrics['error_category'] = category
+            self._finish_job_metrics(job_metrics, 'failed', e)
+            self._journal_state(job['source_url'], 'failed', error=str(e)[:300], category=category)
+            self._record_failure(job['source_url'], e, category)
+            return False
+
+    def _postprocess_worker(self, postprocess_queue, stage_stats):
+        """Son işlem havuzu worker döngüsü - kuyruk boşalana kadar çalışır"""
+        while True:
+            job = postprocess_queue.get()
+            if job is None:
+                break
+            if self.batch_control.stopping:
+                # Başlamamış ffmpeg işleri çalıştırılmaz; --resume ile yeniden kuyruğa girer
+                self._journal_state(job['source_url'], 'interrupted')
+                self._record_stopped(job['source_url'], 'interrupted')
+                continue
+            started = time.time()
+            self._postprocess_media(job)
+            finished = time.time()
+            with self.stats_lock:
+                stage_stats['wait'] += started - job['enqueued']
+                stage_stats['busy'] += finished - started
+                stage_stats['jobs'] += 1
+
+    def _download_worker(self, url, quality_format, is_audio_only, worker_id, postprocess_queue=None, phases=None, acquire_slot=True):
         """Worker thread fonksiyonu"""
         c = self.colors
         try:
-            success = self._download_media(url, quality_format, is_audio_only, worker_id)
-            
-            if not success:
-                success = self._fallback_download(url, is_audio_only, worker_id)
+            success = self._download_media(url, quality_format, is_audio_only, worker_id, postprocess_queue, phases, acquire_slot)
             
             return {
                 'url': url,
@@ -517,8 +3479,7 @@ class NexLoadCore:
                 'worker_id': worker_id
             }
         except Exception as e:
-            with self.stats_lock:
-                self.download_stats['failed'] += 1
+            self._record_failure(url, e)
             return {
                 'url': url,
                 'success': False,
@@ -526,6 +3487,84 @@ class NexLoadCore:
                 'error': str(e)
             }
 
+    def _handle_job_outcome(self, scheduler, job, success, phases):
+        """Devre kesiciyi günceller ve yeniden denenecek işi geri çekilme süresi sonunda kuyruğa koyar"""
+        host = job['host']
+        category = phases.get('error_category')
+        if success or category in ('transient', 'throttled'):
+            until = self.circuit_breaker.record(host, failed=not success)
+            if until is not None:
+                # Host kapalıyken slotlar diğer host'ların işlerine gider
+                scheduler.pause_host(host, until)
+                with self.stats_lock:
+                    paused = self.download_stats.setdefault('paused_hosts', {})
+                    paused[host] = paused.get(host, 0) + 1
+        delay = phases.get('retry_after')
+        if delay is None:
+            return
+        if category == 'throttled':
+            # 429: host'un diğer işleri de aynı süre bekler
+            scheduler.pause_host(host, time.time() + delay)
+        # Ön tahmin sırası korunur; iş bekleme süresince slot tutmaz
+        job['submitted'] = time.time() + delay
+        scheduler.put_later(host, job, delay, priority=job.get('priority', 0))
+
+    def _batch_worker(self, scheduler, format_selector, is_audio_only, worker_id, postprocess_queue, stage_stats):
+        """Batch worker döngüsü: iş hazır olunca slot alır, ardından host zamanlayıcısından işi çeker"""
+        control = self.batch_control
+        while True:
+            # Duraklatmada yeni iş başlamaz; durdurulunca kuyruktaki işler günlükte 'queued' kalır
+            if not control.wait_if_paused():
+                return
+            # Slot yalnızca başlatılabilir bir iş varken istenir; kuyrukta boş bekleyen worker AIMD'de aktif sayılmaz
+            if not scheduler.wait_ready():
+                return
+            self.download_semaphore.acquire()
+            # Host sayacı, min_interval ve devre kesici duraklaması slot alındıktan sonra uygulanır
+            job = scheduler.take()
+            if job is None:
+                self.download_semaphore.release()
+                continue
+            try:
+                if control.stopping or control.is_cancelled(job['url']):
+                    scheduler.done(job['host'])
+                    if control.stopping:
+                        return
+                    self._journal_state(job['url'], 'cancelled')
+                    self._record_stopped(job['url'], 'cancelled')
+                    continue
+                # Deneme sayıları ve başarısız formatlar iş kuyruğa geri döndüğünde de korunur
+                phases = {'slot_acquired': time.time(), 'submitted': job['submitted'],
+                          'attempts': job.setdefault('attempts', {}),
+                          'exclude_formats': job.setdefault('exclude_formats', [])}
+                try:
+                    result = self._download_worker(job['url'], format_selector, is_audio_only, worker_id,
+                                                   postprocess_queue, phases, acquire_slot=False)
+                    self._handle_job_outcome(scheduler, job, result['success'], phases)
+                finally:
+                    scheduler.done(job['host'])
+                    finished = time.time()
+                    with self.stats_lock:
+                        stage_stats['wait'] += phases['slot_acquired'] - job['submitted']
+                        stage_stats['busy'] += finished - phases['slot_acquired']
+                        stage_stats['jobs'] += 1
+                        if phases.get('retry_after') is None:
+                            hosts = self.download_stats['hosts']
+                            hosts[job['host']] = hosts.get(job['host'], 0) + 1
+            finally:
+                self.download_semaphore.release()
+
+    def _download_with_retries(self, url, format_selector, is_audio_only):
+        """Tekli indirme: batch'teki hata politikası, kuyruk yerine bekleyerek uygulanır"""
+        phases = {'attempts': {}, 'exclude_formats': []}
+        while True:
+            phases.pop('retry_after', None)
+            if self._download_media(url, format_selector, is_audio_only, worker_id=0, phases=phases):
+                return True
+            if phases.get('retry_after') is None:
+                return False
+            time.sleep(phases['retry_after'])
+
     def download_single_url(self):
         """Tek URL indirir"""
         c = self.colors
@@ -543,13 +3582,17 @@ class NexLoadCore:
                 print(f"{c['error']}❌ Invalid URL! Please enter a supported platform link.{c['reset']}")
                 continue
 
+            # Önceki batch'ten kalan durdurma/iptal durumu tekli indirmeyi etkilemez
+            self.batch_control.reset()
             print(f"{c['info']}🔍 Fetching media information...{c['reset']}", end='', flush=True)
             info = self._get_video_info(url)
             print(f"\r{c['success']}✓ Media information retrieved{c['reset']}")
             
             if not info:
                 print(f"{c['error']}❌ Cannot get media information!{c['reset']}")
-                self._reinstall_all_packages()
+                # Ağ hatası, iptal veya desteklenmeyen içerik kurulum sorunu değildir
+                if importlib.util.find_spec('yt_dlp') is None:
+                    self._reinstall_all_packages()
                 continue
 
             print(f"\n{c['success']}📊 MEDIA INFORMATION{c['reset']}")
@@ -574,14 +3617,18 @@ class NexLoadCore:
 
             print(f"\n{c['success']}🚀 Downloading in '{desc.split(' ', 1)[1]}' quality...{c['reset']}")
             
-            success = self._download_media(url, format_selector, is_audio_only, worker_id=0)
-            
-            if not success:
-                print(f"{c['warning']}⚠️ First attempt failed, trying alternative methods...{c['reset']}")
-                success = self._fallback_download(url, is_audio_only, worker_id=0)
+            self.progress_board.start()
+            try:
+                success = self._download_with_retries(url, format_selector, is_audio_only)
+            finally:
+                self.progress_board.stop()
 
             if success:
                 print(f"{c['success']}✅ Download completed successfully!{c['reset']}")
+                with self.stats_lock:
+                    last = self.download_stats['downloads'][-1] if self.download_stats['downloads'] else {}
+                if last.get('postprocess'):
+                    print(f"{c['info']}⚙️ Post-processing: {c['secondary']}{last['postprocess']}{c['reset']} {c['info']}(format {last['format']}){c['reset']}")
             else:
                 print(f"{c['error']}❌ Download failed. Please check the URL or try again later.{c['reset']}")
 
@@ -597,7 +3644,24 @@ class NexLoadCore:
         print(f"{c['primary']}║{c['highlight']}                   BATCH DOWNLOAD (PARALLEL)                  {c['primary']}║{c['reset']}")
         print(f"{c['primary']}╚═══════════════════════════════════════════════════════════════╝{c['reset']}")
         print(f"{c['info']}💡 Enter one URL per line, leave empty line to finish{c['reset']}")
-        print(f"{c['info']}🧵 Parallel workers: {c['highlight']}{self.max_workers}{c['reset']}")
+        print(f"{c['info']}🧵 Parallel workers: {c['highlight']}{self.max_workers}{c['reset']} {c['info']}• 🎞️ Post-process workers: {c['highlight']}{self.postprocess_workers}{c['reset']}")
+        
+        # Yarıda kalmış batch varsa kaldığı yerden devam etmeyi öner
+        journal = JobJournal(self._state_file('journal.jsonl'))
+        unfinished = journal.unfinished()
+        if unfinished:
+            batch_id, settings, pending = unfinished
+            print(f"\n{c['warning']}♻️ Unfinished batch found: {len(pending)} URLs not completed ({settings.get('quality', '?')}){c['reset']}")
+            answer = input(f"{c['highlight']}👆 Resume it? (y/n): {c['reset']}").strip().lower()
+            if answer == 'y':
+                print(f"\n{c['success']}🚀 Resuming {len(pending)} URLs (partial files are continued)...{c['reset']}\n")
+                stats = self._run_batch(pending, settings.get('format'), settings.get('audio', False),
+                                        batch_id=batch_id, quality=settings.get('quality', ''))
+                self._print_batch_summary(stats)
+                input(f"\n{c['warning']}⏎ Press Enter to continue...{c['reset']}")
+                return
+            for url in pending:
+                journal.record(batch_id, url, 'cancelled')
         
         while True:
             url = input(f"{c['secondary']}URL {len(urls)+1}: {c['reset']}").strip()
@@ -630,48 +3694,284 @@ class NexLoadCore:
         desc, format_selector = self.quality_options[choice]
         is_audio_only = choice == '9'
 
+        print(f"\n{c['success']}🚀 Starting parallel download with {self.max_workers} workers...{c['reset']}")
+        print(f"{c['info']}📥 Processing {len(urls)} files in '{desc.split(' ', 1)[1]}' quality...{c['reset']}\n")
+        
+        stats = self._run_batch(urls, format_selector, is_audio_only, quality=desc.split(' ', 1)[1])
+        self._print_batch_summary(stats)
+        
+        input(f"\n{c['warning']}⏎ Press Enter to continue...{c['reset']}")
+
+    def _run_batch(self, urls, format_selector, is_audio_only=False, batch_id=None, quality=''):
+        """URL akışını indirme ve son işlem aşamalarından geçirir, istatistikleri döndürür"""
+        try:
+            return self._execute_batch(urls, format_selector, is_audio_only, batch_id, quality)
+        finally:
+            # Durdurma isteği yalnızca bu batch'e aittir; sonraki tekli indirmeler iptal edilmez
+            self.batch_control.reset()
+            self.batch_control.control_path = None
+
+    def _execute_batch(self, urls, format_selector, is_audio_only, batch_id, quality):
+        """Batch aşamalarını kurar, çalıştırır ve istatistikleri toplar"""
+        # İş günlüğü: batch_id verilirse yarıda kalmış batch devam ettirilir
+        self.journal = JobJournal(self._state_file('journal.jsonl'))
+        if batch_id is None:
+            batch_id = uuid.uuid4().hex[:12]
+            self.journal.start_batch(batch_id, format=format_selector, audio=is_audio_only, quality=quality)
+        self.batch_id = batch_id
         # Reset stats
         with self.stats_lock:
             self.download_stats = {
-                'total': len(urls),
+                'total': 0,
                 'successful': 0,
                 'failed': 0,
                 'total_size': 0,
                 'total_time': 0,
-                'downloads': []
+                # Sonuç listeleri kayan penceredir; işlerin tamamı journal.jsonl'e yazılır
+                'downloads': deque(maxlen=self.recent_results),
+                'postprocess_modes': {},
+                'hosts': {},
+                'skipped': 0,
+                'duplicates': 0,
+                'invalid': 0,
+                'cancelled': 0,
+                'interrupted': 0,
+                'short_links': {'resolved': 0, 'cached': 0, 'failed': 0},
+                'retries': {},
+                'failure_categories': {},
+                'paused_hosts': {},
+                'errors': deque(maxlen=self.recent_results)
             }
-
-        print(f"\n{c['success']}🚀 Starting parallel download with {self.max_workers} workers...{c['reset']}")
-        print(f"{c['info']}📥 Processing {len(urls)} files in '{desc.split(' ', 1)[1]}' quality...{c['reset']}\n")
+            self.circuit_breaker = CircuitBreaker(**self.circuit_breaker_options)
+        # Durdurma/duraklatma durumu sıfırlanır; eski control.json yeni batch'i etkilemez
+        control = self.batch_control
+        control.reset()
+        control.control_path = self._state_file('control.json')
+        if os.path.exists(control.control_path):
+            os.remove(control.control_path)
+        # Adaptif slot kontrolü: havuz üst sınıra göre açılır, aktif slotları AIMD belirler
+        pool_size = self.max_workers_cap if self.adaptive_workers else self.max_workers
+        self.download_semaphore = AdaptiveConcurrency(
+            self.max_workers,
+            min(self.min_workers, self.max_workers) if self.adaptive_workers else self.max_workers,
+            pool_size,
+            log_path=self._state_file('concurrency.log')
+        )
+        if self.adaptive_workers:
+            self.download_semaphore.start()
+        # Bütçe her worker'a en az bir bağlantı bırakır; artan kısım segmentlere gider
+        self.connection_budget = ConnectionBudget(max(self.max_connections, pool_size))
+        # Sınırlar batch sürerken .nexload/bandwidth.json üzerinden değiştirilebilir
+        self.bandwidth.control_path = self._state_file('bandwidth.json')
+        self.bandwidth.throttled_seconds = 0.0
+        stage_stats = {
+            'download': {'workers': self.max_workers, 'wait': 0.0, 'busy': 0.0, 'jobs': 0},
+            'postprocess': {'workers': self.postprocess_workers, 'wait': 0.0, 'busy': 0.0, 'jobs': 0},
+            'probe': {'workers': self.probe_workers, 'wait': 0.0, 'busy': 0.0, 'jobs': 0},
+        }
+        # Sınırlı kuyruk: son işlem geride kalırsa indirme worker'ları bekler, bellek batch boyutuyla büyümez
+        postprocess_queue = Queue(maxsize=max(1, self.postprocess_workers) * 2)
+        probe_queue = Queue() if self.probe_workers > 0 else None
+        cache_before = self._get_info_cache().counters() if self.use_info_cache else None
         
         start_time = time.time()
+        self.progress_board.start()
+        if self.job_store is not None:
+            self.job_store.start_heartbeat()
         
-        # ThreadPoolExecutor ile paralel indirme
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {}
+        # Son işlem havuzu: CPU sayısına göre sınırlı ffmpeg işleri
+        with self._interrupt_handler(), ThreadPoolExecutor(max_workers=self.postprocess_workers) as pp_executor:
+            pp_futures = [
+                pp_executor.submit(self._postprocess_worker, postprocess_queue, stage_stats['postprocess'])
+                for _ in range(self.postprocess_workers)
+            ]
             
-            for idx, url in enumerate(urls):
-                future = executor.submit(
-                    self._download_worker,
-                    url,
-                    format_selector,
-                    is_audio_only,
-                    idx % self.max_workers
-                )
-                futures[future] = url
+            # Host bazlı adil kuyruk; her platform kendi eşzamanlılık ve aralık sınırıyla
+            scheduler = HostScheduler(self.host_limits, capacity=self.queue_window)
             
-            # Tamamlanan görevleri takip et
-            completed = 0
-            for future in as_completed(futures):
-                completed += 1
-                try:
-                    result = future.result()
-                except Exception as e:
-                    with self.stats_lock:
-                        self.download_stats['failed'] += 1
+            # ThreadPoolExecutor ile paralel indirme; worker'lar URL'ler okunurken çalışmaya başlar
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                futures = [
+                    executor.submit(
+                        self._batch_worker,
+                        scheduler,
+                        format_selector,
+                        is_audio_only,
+                        worker_id,
+                        postprocess_queue,
+                        stage_stats['download']
+                    )
+                    for worker_id in range(pool_size)
+                ]
+                
+                # Probe aşaması indirmelerle eşzamanlı çalışır ve kuyruğu öncelik sırasıyla besler
+                with ThreadPoolExecutor(max_workers=max(1, self.probe_workers)) as probe_executor:
+                    probe_futures = [
+                        probe_executor.submit(self._probe_worker, probe_queue, scheduler,
+                                              format_selector, is_audio_only, stage_stats['probe'])
+                        for _ in range(self.probe_workers)
+                    ]
+                    try:
+                        self._feeding = True
+                        self._feed_scheduler(scheduler, urls, probe_queue)
+                    except BatchStopped:
+                        pass
+                    finally:
+                        self._feeding = False
+                        for _ in probe_futures:
+                            probe_queue.put(None)
+                        for future in probe_futures:
+                            future.result()
+                        scheduler.close()
+                
+                for future in as_completed(futures):
+                    future.result()
+            
+            # İndirmeler bitti; son işlem worker'larını kapat
+            for _ in pp_futures:
+                postprocess_queue.put(None)
+            if control.stopping:
+                # Süren ffmpeg işlerine sınırlı süre tanınır, sonra sonlandırılır
+                _, running = wait(pp_futures, timeout=self.shutdown_timeout)
+                if running:
+                    _terminate_child_processes()
 
         end_time = time.time()
         total_elapsed = end_time - start_time
+        self.progress_board.stop()
+        self.download_semaphore.stop()
+        if self.metrics is not None:
+            self.metrics.write_textfile()
+        if self.job_store is not None:
+            # Başlamamış veya durdurulmuş işler diğer düğümlere bırakılır
+            self.job_store.release()
+            self.job_store.stop_heartbeat()
+        stage_stats['download']['workers'] = self.download_semaphore.peak
+        self.journal = None
+        self.batch_id = None
+
+        with self.stats_lock:
+            stats = self.download_stats.copy()
+            stats['downloads'] = list(stats['downloads'])
+            stats['errors'] = list(stats['errors'])
+            for key in ('postprocess_modes', 'retries', 'failure_categories', 'paused_hosts'):
+                stats[key] = dict(stats[key])
+        stats['journal'] = self._state_file('journal.jsonl')
+        stats['elapsed'] = total_elapsed
+        stats['stopped'] = control.stopping
+        if self.job_store is not None:
+            stats['cluster'] = self.job_store.stats()
+        stats['concurrency'] = {
+            'min': self.download_semaphore.minimum,
+            'max': self.download_semaphore.maximum,
+            'final': self.download_semaphore.limit,
+            'peak': self.download_semaphore.peak,
+            'decisions': self.download_semaphore.decision_count,
+        }
+        stats['connections'] = {
+            'budget': self.connection_budget.total,
+            'peak': self.connection_budget.peak,
+        }
+        stats['bandwidth'] = {
+            'limit': self.bandwidth.current_rate(),
+            'throttled_seconds': round(self.bandwidth.throttled_seconds, 2),
+        }
+        if cache_before is not None:
+            cache_after = self._get_info_cache().counters()
+            stats['info_cache'] = {name: cache_after[name] - cache_before[name] for name in cache_after}
+            stats['info_cache']['disk_bytes'] = self.disk_info_cache.total_bytes
+        stats['stages'] = {}
+        for name, stage in stage_stats.items():
+            capacity = stage['workers'] * total_elapsed
+            stats['stages'][name] = {
+                'workers': stage['workers'],
+                'jobs': stage['jobs'],
+                'avg_wait': stage['wait'] / stage['jobs'] if stage['jobs'] else 0.0,
+                'utilization': stage['busy'] / capacity if capacity > 0 else 0.0,
+            }
+        return stats
+
+    @contextlib.contextmanager
+    def _interrupt_handler(self):
+        """Batch süresince Ctrl-C/SIGTERM'i kontrollü durdurmaya çevirir; ikinci Ctrl-C hemen çıkar"""
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        import signal
+        control = self.batch_control
+        c = self.colors
+
+        def handle(signum, frame):
+            if control.stopping:
+                raise KeyboardInterrupt
+            control.stop()
+            sys.stderr.write(f"\n{c['warning']}⏹️ Stopping: no new jobs, partial files are kept for --resume "
+                             f"(press Ctrl-C again to force){c['reset']}\n")
+            if self._feeding:
+                raise BatchStopped()
+
+        signals = [signal.SIGINT] + ([signal.SIGTERM] if hasattr(signal, 'SIGTERM') else [])
+        previous = {signum: signal.signal(signum, handle) for signum in signals}
+        try:
+            yield
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def _feed_scheduler(self, scheduler, urls, probe_queue=None):
+        """URL'leri okundukça doğrular, tekrarları eler ve host kuyruğuna (veya probe aşamasına) ekler"""
+        # Tekrar kontrolü 8 byte'lık özetlerle yapılır; büyük batch'lerde URL metinleri bellekte tutulmaz
+        seen_keys = set()
+        archive = self._get_archive() if self.use_archive else None
+        # Kısa linkler önce çözülür (depodaki işler eklenirken çözülmüştür); playlist girdileri sayfa geldikçe kuyruğa girer
+        source = urls if self.job_store is not None else self._resolve_urls(urls)
+        for url in self._expand_urls(source):
+            if self.batch_control.stopping:
+                break
+            with self.stats_lock:
+                self.download_stats['total'] += 1
+            if not self._validate_url(url):
+                with self.stats_lock:
+                    self.download_stats['invalid'] += 1
+                    self.download_stats['errors'].append({'url': url, 'error': 'unsupported URL'})
+                if self.job_store is not None:
+                    self._store_finish(url, 'invalid', error='unsupported URL')
+                continue
+            # Aynı batch içindeki tekrarlar ve arşivdeki medya gönderilmeden elenir
+            # Farklı yazılmış aynı medya (youtu.be / watch?v=) extractor + id ile yakalanır
+            normalized = self._normalize_url(url)
+            archive_id = self._archive_id(url)
+            # extractor + id varsa URL yazımından bağımsız tek anahtar odur
+            seen_key = hashlib.blake2b((archive_id or 'url ' + normalized).encode('utf-8'), digest_size=8).digest()
+            if seen_key in seen_keys:
+                with self.stats_lock:
+                    self.download_stats['duplicates'] += 1
+                if self.job_store is not None:
+                    self._store_finish(url, 'duplicate')
+                continue
+            seen_keys.add(seen_key)
+            if archive is not None and (archive.contains(normalized_url=normalized)
+                                        or archive.contains(archive_id=archive_id)):
+                with self.stats_lock:
+                    self.download_stats['skipped'] += 1
+                self._journal_state(url, 'skipped')
+                continue
+            # Geri basınç: pencere doluysa girdi okuma, bir iş indirmeye başlayana kadar bekler
+            while not scheduler.reserve(timeout=0.5):
+                if self.batch_control.stopping:
+                    return
+            host = self._host_key(url)
+            self._journal_state(url, 'queued')
+            job = {'url': url, 'host': host, 'submitted': time.time(), 'seq': len(seen_keys)}
+            if probe_queue is not None:
+                probe_queue.put(job)
+            else:
+                scheduler.put(host, job)
+
+    def _print_batch_summary(self, stats):
+        """Toplu indirme sonuç raporunu yazdırır"""
+        c = self.colors
+        total_elapsed = stats['elapsed']
 
         # Sonuç raporu
         table_width = 76
@@ -679,20 +3979,56 @@ class NexLoadCore:
         print(f"{c['highlight']}{'  📦 PARALLEL BATCH DOWNLOAD - SUMMARY REPORT':^{table_width}}{c['reset']}")
         print(f"{c['primary']}{'═' * table_width}{c['reset']}")
         
-        with self.stats_lock:
-            stats = self.download_stats.copy()
+        pp_counts = stats.get('postprocess_modes', {})
+        pp_summary = ' • '.join(f'{count} {mode}' for mode, count in sorted(pp_counts.items())) or '-'
+        
+        def stage_summary(stage):
+            return f"{stage['workers']} workers • {stage['utilization']:.0%} busy • avg queue wait {stage['avg_wait']:.1f}s"
+        
+        def counts_summary(counts):
+            return ' '.join(f'{name} {count}' for name, count in sorted((counts or {}).items())) or '-'
+        
+        def cluster_summary(cluster):
+            status = cluster['status']
+            alive = sum(1 for node in cluster['nodes'].values() if node['alive'])
+            return (f"{len(cluster['nodes'])} nodes ({alive} alive) • {status.get('done', 0)}/{cluster['total']} done "
+                    f"• {status.get('failed', 0)} failed • {status.get('pending', 0) + status.get('leased', 0)} open "
+                    f"• {cluster['total_size'] / (1024 * 1024):.2f} MB")
+        
+        def info_cache_summary(cache):
+            if not cache:
+                return 'disabled'
+            lookups = cache['hits'] + cache['stale_hits'] + cache['misses']
+            rate = (cache['hits'] + cache['stale_hits']) / lookups if lookups else 0
+            return (f"{cache['hits']} hits • {cache['stale_hits']} stale (metadata only) • {cache['misses']} misses "
+                    f"• {rate:.0%} hit rate • {cache['disk_bytes'] / (1024 * 1024):.1f} MB on disk")
         
         batch_rows = [
             ('📊 Total Files', f'{stats["total"]} files'),
             ('✅ Successful', f'{stats["successful"]} files', 'success'),
             ('❌ Failed', f'{stats["failed"]} files', 'error'),
+            ('⏭️ Skipped', f'{stats.get("skipped", 0)} already downloaded • {stats.get("duplicates", 0)} duplicates', 'warning'),
+            ('🔁 Retries', counts_summary(stats.get('retries')) + ' • failed as ' + counts_summary(stats.get('failure_categories'))
+             + ' • hosts paused ' + counts_summary(stats.get('paused_hosts')), 'warning'),
+            ('⏹️ Stopped', f'{stats.get("interrupted", 0)} interrupted (resumable) • {stats.get("cancelled", 0)} cancelled', 'warning'),
             ('💾 Total Size', f'{stats["total_size"] / (1024 * 1024):.2f} MB'),
             ('⏱️ Total Time', f'{int(total_elapsed // 60)}m {int(total_elapsed % 60)}s'),
-            ('🧵 Workers Used', f'{self.max_workers} threads'),
+            ('🔗 Short Links', '{resolved} resolved • {cached} from cache • {failed} unresolved'.format(
+                **stats.get('short_links', {'resolved': 0, 'cached': 0, 'failed': 0}))),
+            ('🖧 Cluster', cluster_summary(stats['cluster'])) if stats.get('cluster') else None,
+            ('🗃️ Info Cache', info_cache_summary(stats.get('info_cache'))),
+            ('🔎 Probe Stage', f"{stats['stages']['probe']['workers']} workers • {stats['stages']['probe']['jobs']} probed • order {self.job_order}"),
+            ('🧵 Download Stage', stage_summary(stats['stages']['download'])),
+            ('📈 Adaptive Slots', f"{stats['concurrency']['min']}-{stats['concurrency']['max']} • peak {stats['concurrency']['peak']} • final {stats['concurrency']['final']}"),
+            ('🔌 Connections', f"budget {stats['connections']['budget']} • peak {stats['connections']['peak']}"),
+            ('🚦 Bandwidth Cap', f"{stats['bandwidth']['limit'] / (1024 * 1024):.2f} MB/s" if stats.get('bandwidth', {}).get('limit') else 'unlimited'),
+            ('🎞️ Post-process Stage', stage_summary(stats['stages']['postprocess'])),
+            ('⚙️ Post-processing', pp_summary),
+            ('🌐 Hosts', ' • '.join(f'{host} {count}' for host, count in sorted(stats.get('hosts', {}).items())) or '-'),
             ('📂 Save Location', str(Path(self.downloads_path).name)),
         ]
         
-        for row in batch_rows:
+        for row in filter(None, batch_rows):
             label = row[0]
             value = row[1]
             color_type = row[2] if len(row) > 2 else 'info'
@@ -702,37 +4038,32 @@ class NexLoadCore:
         print(f"{c['primary']}{'═' * table_width}{c['reset']}")
         print(f"{c['secondary']}  ✨ Full path: {c['warning']}{self.downloads_path}{c['reset']}")
         print(f"{c['primary']}{'═' * table_width}{c['reset']}\n")
-        
-        input(f"\n{c['warning']}⏎ Press Enter to continue...{c['reset']}")
 
     def show_download_stats(self):
         """İndirme istatistiklerini gösterir"""
         c = self.colors
         try:
-            files = list(Path(self.downloads_path).glob('*'))
-            videos = [f for f in files if f.suffix.lower() in ['.mp4', '.mkv', '.avi', '.mov']]
-            audios = [f for f in files if f.suffix.lower() in ['.mp3', '.wav', '.m4a', '.aac']]
+            catalog = self._get_catalog()
+            catalog.rescan()
+            summary = catalog.summary()
             
             print(f"\n{c['primary']}╔════════════════════════════════���══════════════════════════════╗{c['reset']}")
             print(f"{c['primary']}║{c['highlight']}                   DOWNLOAD STATISTICS                   {c['primary']}║{c['reset']}")
             print(f"{c['primary']}╚═══════════════════════════════════════════════════════════════╝{c['reset']}")
             print(f"{c['info']}📁 Location: {c['highlight']}{self.downloads_path}{c['reset']}")
-            print(f"{c['secondary']}🎬 Video files: {c['success']}{len(videos)}{c['reset']}")
-            print(f"{c['secondary']}🎵 Audio files: {c['success']}{len(audios)}{c['reset']}")
-            print(f"{c['secondary']}📦 Total files: {c['warning']}{len(files)}{c['reset']}")
+            print(f"{c['secondary']}🎬 Video files: {c['success']}{summary['video']}{c['reset']}")
+            print(f"{c['secondary']}🎵 Audio files: {c['success']}{summary['audio']}{c['reset']}")
+            print(f"{c['secondary']}📦 Total files: {c['warning']}{summary['files']}{c['reset']}")
             print(f"{c['info']}🧵 Max Workers: {c['highlight']}{self.max_workers}{c['reset']}")
             
-            if files:
-                total_size = sum(f.stat().st_size for f in files if f.is_file())
-                size_mb = total_size / (1024 * 1024)
+            if summary['files']:
+                size_mb = summary['total_size'] / (1024 * 1024)
                 print(f"{c['secondary']}💾 Total size: {c['highlight']}{size_mb:.2f} MB{c['reset']}")
                 
                 print(f"\n{c['primary']}📋 RECENT DOWNLOADS:{c['reset']}")
-                recent_files = sorted(files, key=lambda x: x.stat().st_mtime, reverse=True)[:5]
-                for i, file in enumerate(recent_files, 1):
-                    if file.is_file():
-                        size_mb = file.stat().st_size / (1024 * 1024)
-                        print(f"{c['info']}{i}.{c['reset']} {c['secondary']}{file.name}{c['reset']} {c['warning']}({size_mb:.1f} MB){c['reset']}")
+                for i, entry in enumerate(catalog.recent(5), 1):
+                    size_mb = entry['size'] / (1024 * 1024)
+                    print(f"{c['info']}{i}.{c['reset']} {c['secondary']}{os.path.basename(entry['path'])}{c['reset']} {c['warning']}({size_mb:.1f} MB){c['reset']}")
             
         except Exception as e:
             print(f"{c['error']}❌ Cannot get statistics: {e}{c['reset']}")
@@ -746,7 +4077,8 @@ class NexLoadCore:
         print(f"{c['info']}🚀 Initializing NexLoad Premium (Parallel Optimized)...{c['reset']}")
         self.check_and_install_dependencies()
         self._create_download_directory()
-        print(f"{c['success']}✓ System ready with {self.max_workers} parallel workers!{c['reset']}\n")
+        self.startup_time = time.perf_counter() - _PROCESS_START
+        print(f"{c['success']}✓ System ready with {self.max_workers} parallel workers!{c['reset']} {c['info']}(startup {self.startup_time:.2f}s){c['reset']}\n")
         
         while True:
             self._clear_screen()
@@ -787,13 +4119,331 @@ class NexLoadCore:
             else:
                 print(f"{c['error']}❌ Invalid selection!{c['reset']}")
 
+    def _resolve_quality(self, value):
+        """Komut satırı kalite değerini (1-9, 1080p, audio...) menü anahtarına çevirir"""
+        value = str(value).strip().lower()
+        if value in self.quality_options:
+            return value
+        aliases = {
+            '4k': '1', '2160': '1', '1440': '2', '1080': '3', '720': '4',
+            '480': '5', '360': '6', '240': '7', '144': '8', 'audio': '9', 'mp3': '9',
+        }
+        if value.endswith('p') and value[:-1].isdigit():
+            value = value[:-1]
+        return aliases.get(value)
+
+    def _iter_input_urls(self, urls, sources):
+        """Komut satırı URL'lerini, ardından dosya/stdin ('-') satırlarını okundukça üretir"""
+        for url in urls or []:
+            yield url
+        for source in sources:
+            if source == '-':
+                handle = sys.stdin
+            else:
+                handle = open(source, 'r', encoding='utf-8')
+            try:
+                for line in handle:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        yield line
+            finally:
+                if handle is not sys.stdin:
+                    handle.close()
+
+    def run_headless(self, args):
+        """Menüsüz toplu indirme; sonuca göre çıkış kodu döndürür"""
+        c = self.colors
+        # Paketler import edilmeden yalnızca kurulu olup olmadıklarına bakılır
+        versions = self._installed_versions()
+        missing = [package for package in ('yt-dlp',) if versions.get(package) is None]
+        if missing:
+            print(f"{c['error']}❌ Missing packages: {', '.join(missing)} (run NexLoad interactively to install){c['reset']}", file=sys.stderr)
+            return EXIT_ERROR
+
+        choice = self._resolve_quality(args.quality)
+        if choice is None:
+            print(f"{c['error']}❌ Invalid quality: {args.quality}{c['reset']}", file=sys.stderr)
+            return EXIT_USAGE
+        desc, format_selector = self.quality_options[choice]
+        is_audio_only = choice == '9'
+        quality = desc.split(' ', 1)[1]
+
+        if args.output:
+            self.downloads_path = os.path.abspath(os.path.expanduser(args.output))
+        try:
+            os.makedirs(self.downloads_path, exist_ok=True)
+        except OSError as e:
+            print(f"{c['error']}❌ Cannot create directory: {e}{c['reset']}", file=sys.stderr)
+            return EXIT_ERROR
+        if args.workers:
+            # Kullanıcının verdiği sayı kesin üst sınırdır; adaptif mod daha azıyla başlayabilir ama aşamaz
+            self.max_workers = args.workers
+            self.max_workers_cap = args.workers
+            self.min_workers = min(self.min_workers, args.workers)
+        if args.fixed_workers:
+            self.adaptive_workers = False
+        if args.pp_workers:
+            self.postprocess_workers = args.pp_workers
+        self.job_order = args.order
+        if args.no_archive:
+            self.use_archive = False
+        if args.no_info_cache:
+            self.use_info_cache = False
+        if args.info_cache_size:
+            self.info_cache_max_bytes = args.info_cache_size * 1024 * 1024
+        try:
+            if args.limit_rate:
+                self.bandwidth.set_rate(args.limit_rate)
+            for entry in args.host_limit_rate or []:
+                host, _, rate = entry.partition('=')
+                self.bandwidth.set_host_rate(host.strip().lower(), rate)
+            if args.rate_schedule:
+                self.bandwidth.set_schedule(args.rate_schedule)
+        except (ValueError, IndexError):
+            print(f"{c['error']}❌ Invalid bandwidth limit (use e.g. 5M, youtube=2M, 09:00-18:00=2M){c['reset']}", file=sys.stderr)
+            return EXIT_USAGE
+        if args.metrics_port is not None:
+            self.metrics_port = args.metrics_port
+            self._get_metrics()
+        if args.update_yt_dlp:
+            with contextlib.redirect_stdout(sys.stderr):
+                self.update_yt_dlp()
+            if not args.input and not args.urls and not args.resume:
+                return EXIT_OK
+
+        if args.store:
+            return self._run_store_node(args, format_selector, is_audio_only, quality)
+
+        resume = None
+        if args.resume:
+            resume = JobJournal(self._state_file('journal.jsonl')).unfinished()
+        sources = list(args.input or [])
+        if not sources and not args.urls and resume is None:
+            if sys.stdin.isatty():
+                print(f"{c['error']}❌ No input: pass URLs, --input FILE or pipe URLs to stdin{c['reset']}", file=sys.stderr)
+                return EXIT_USAGE
+            sources = ['-']
+        for source in sources:
+            if source != '-' and not os.path.isfile(source):
+                print(f"{c['error']}❌ Input file not found: {source}{c['reset']}", file=sys.stderr)
+                return EXIT_USAGE
+
+        self.startup_time = time.perf_counter() - _PROCESS_START
+        # JSON stdout'a yazılacaksa ilerleme ve uyarılar stderr'e yönlendirilir
+        json_to_stdout = args.json == '-'
+        output = contextlib.redirect_stdout(sys.stderr) if json_to_stdout else contextlib.nullcontext()
+        with output:
+            if resume is not None:
+                batch_id, settings, pending = resume
+                print(f"{c['info']}♻️ Resuming batch {batch_id}: {len(pending)} URLs{c['reset']}", file=sys.stderr)
+                stats = self._run_batch(pending, settings.get('format'), settings.get('audio', False),
+                                        batch_id=batch_id, quality=settings.get('quality', ''))
+                if (sources or args.urls) and not stats.get('stopped'):
+                    stats = self._merge_batch_stats(stats, self._run_batch(
+                        self._iter_input_urls(args.urls, sources), format_selector, is_audio_only, quality=quality))
+                else:
+                    quality = settings.get('quality', '')
+            else:
+                stats = self._run_batch(self._iter_input_urls(args.urls, sources), format_selector,
+                                        is_audio_only, quality=quality)
+            if not json_to_stdout:
+                self._print_batch_summary(stats)
+
+        return self._finish_headless(args, stats, quality, json_to_stdout)
+
+    def _run_store_node(self, args, format_selector, is_audio_only, quality):
+        """Paylaşımlı iş deposuna URL ekler (verildiyse) ve depo boşalana kadar iş kiralayıp indirir"""
+        c = self.colors
+        try:
+            self.job_store = JobStore(os.path.abspath(os.path.expanduser(args.store)), node=args.node,
+                                      lease_seconds=args.lease)
+        except sqlite3.Error as e:
+            print(f"{c['error']}❌ Cannot open job store: {e}{c['reset']}", file=sys.stderr)
+            return EXIT_ERROR
+        # Depo modunda stdin yalnızca '-i -' ile okunur; URL'siz düğüm yalnızca iş alır
+        sources = list(args.input or [])
+        for source in sources:
+            if source != '-' and not os.path.isfile(source):
+                print(f"{c['error']}❌ Input file not found: {source}{c['reset']}", file=sys.stderr)
+                return EXIT_USAGE
+
+        feeder = None
+        if sources or args.urls:
+            # İlk ekleyen düğümün kalite ayarı tüm düğümlerde geçerlidir
+            self.job_store.set_meta('settings', {'format': format_selector, 'audio': is_audio_only,
+                                                 'quality': quality}, replace=False)
+            self.job_store.start_feeding()
+            feed_stop = Event()
+
+            def until_stopped(urls):
+                # Batch sonunda durdurma durumu sıfırlanır; besleyici kendi bayrağıyla da durur
+                for url in urls:
+                    if feed_stop.is_set() or self.batch_control.stopping:
+                        return
+                    yield url
+
+            def feed():
+                try:
+                    self.job_store.add(until_stopped(self._resolve_urls(self._iter_input_urls(args.urls, sources))))
+                finally:
+                    try:
+                        self.job_store.finish_feeding()
+                    except sqlite3.Error:
+                        pass  # Depo kapandıysa kiralama süresi dolunca mühürlü sayılır
+
+            # Ekleme sürerken bu düğüm ve diğerleri iş almaya başlar
+            feeder = threading.Thread(target=feed, daemon=True, name='job-store-feed')
+            feeder.start()
+        settings = self.job_store.get_meta('settings')
+        if settings is None:
+            print(f"{c['error']}❌ Job store is empty: add URLs from one node first{c['reset']}", file=sys.stderr)
+            return EXIT_USAGE
+        print(f"{c['info']}🖧 Node {self.job_store.node} working on {args.store}{c['reset']}", file=sys.stderr)
+
+        self.startup_time = time.perf_counter() - _PROCESS_START
+        json_to_stdout = args.json == '-'
+        output = contextlib.redirect_stdout(sys.stderr) if json_to_stdout else contextlib.nullcontext()
+        try:
+            with output:
+                stats = self._run_batch(self._claim_urls(self.job_store), settings['format'], settings['audio'],
+                                        quality=settings['quality'])
+                if feeder is not None:
+                    if stats.get('stopped'):
+                        # stdin gibi bloklayan girdide beklenmez; besleme kiralaması kendiliğinden dolar
+                        feed_stop.set()
+                        feeder.join(self.shutdown_timeout)
+                    else:
+                        feeder.join()
+                if not json_to_stdout:
+                    self._print_batch_summary(stats)
+        finally:
+            self.job_store.close()
+            self.job_store = None
+        return self._finish_headless(args, stats, settings['quality'], json_to_stdout)
+
+    def _finish_headless(self, args, stats, quality, json_to_stdout):
+        """Çıkış kodunu belirler ve istenirse JSON raporunu yazar"""
+        failed = stats['failed'] + stats.get('invalid', 0)
+        if stats.get('stopped'):
+            exit_code = EXIT_INTERRUPTED
+        elif failed == 0:
+            exit_code = EXIT_OK
+        elif stats['successful'] == 0:
+            exit_code = EXIT_FAILED
+        else:
+            exit_code = EXIT_PARTIAL
+
+        if args.json:
+            summary = dict(stats)
+            summary['quality'] = quality
+            summary['output_dir'] = self.downloads_path
+            summary['exit_code'] = exit_code
+            summary['startup_time'] = self.startup_time
+            report = json.dumps(summary, ensure_ascii=False, indent=2, default=str)
+            if json_to_stdout:
+                sys.stdout.write(report + '\n')
+                sys.stdout.flush()
+            else:
+                with open(args.json, 'w', encoding='utf-8') as f:
+                    f.write(report + '\n')
+        return exit_code
+
+    def _merge_batch_stats(self, first, second):
+        """Ardışık iki batch çalıştırmasının sayaçlarını tek raporda birleştirir"""
+        merged = dict(second)
+        for key in ('total', 'successful', 'failed', 'total_size', 'total_time', 'skipped', 'duplicates', 'invalid',
+                    'cancelled', 'interrupted', 'elapsed'):
+            merged[key] = first.get(key, 0) + second.get(key, 0)
+        merged['stopped'] = first.get('stopped', False) or second.get('stopped', False)
+        for key in ('downloads', 'errors'):
+            merged[key] = (first.get(key, []) + second.get(key, []))[-self.recent_results:]
+        for key in ('postprocess_modes', 'retries', 'failure_categories', 'paused_hosts'):
+            counts = dict(first.get(key, {}))
+            for name, count in second.get(key, {}).items():
+                counts[name] = counts.get(name, 0) + count
+            merged[key] = counts
+        hosts = dict(first.get('hosts', {}))
+        for host, count in second.get('hosts', {}).items():
+            hosts[host] = hosts.get(host, 0) + count
+        merged['hosts'] = hosts
+        if first.get('short_links') and second.get('short_links'):
+            merged['short_links'] = {name: first['short_links'][name] + second['short_links'][name]
+                                     for name in second['short_links']}
+        if first.get('info_cache') and second.get('info_cache'):
+            merged['info_cache'] = {name: first['info_cache'][name] + second['info_cache'][name]
+                                    for name in ('hits', 'stale_hits', 'misses')}
+            merged['info_cache']['disk_bytes'] = second['info_cache']['disk_bytes']
+        return merged
+
+
+# Headless mod çıkış kodları
+EXIT_OK = 0         # Tüm URL'ler indirildi (veya arşivde vardı)
+EXIT_PARTIAL = 1    # Bazı URL'ler başarısız
+EXIT_USAGE = 2      # Hatalı argüman / girdi
+EXIT_FAILED = 3     # Hiçbir URL indirilemedi
+EXIT_ERROR = 4      # Ortam hatası (eksik paket, yazılamayan klasör)
+EXIT_INTERRUPTED = 130  # Ctrl-C/SIGTERM ile durduruldu; --resume ile devam edilebilir
+
+
+def build_arg_parser():
+    """Headless komut satırı argümanlarını tanımlar"""
+    parser = argparse.ArgumentParser(
+        prog='NexLoad',
+        description='NexLoad headless batch downloader. Without arguments the interactive menu starts.'
+    )
+    parser.add_argument('urls', nargs='*', help='media URLs to download')
+    parser.add_argument('-i', '--input', action='append', metavar='FILE',
+                        help="file with one URL per line, '-' for stdin (repeatable)")
+    parser.add_argument('-q', '--quality', default='3',
+                        help='quality: 1-9 menu key or 4k/1440p/1080p/720p/480p/360p/240p/144p/audio (default: 1080p)')
+    parser.add_argument('-o', '--output', metavar='DIR', help='download directory (default: ~/Downloads/NexLoad)')
+    parser.add_argument('-w', '--workers', type=int, metavar='N', help='parallel download workers (hard upper limit)')
+    parser.add_argument('--fixed-workers', action='store_true', help='disable adaptive worker count')
+    parser.add_argument('--pp-workers', type=int, metavar='N', help='post-processing (ffmpeg) workers')
+    parser.add_argument('--order', choices=('longest', 'shortest', 'fifo'), default='longest',
+                        help='download order after metadata probing (default: longest first)')
+    parser.add_argument('--no-archive', action='store_true', help='download even if the URL is in the archive')
+    parser.add_argument('--no-info-cache', action='store_true', help='do not reuse metadata cached on disk')
+    parser.add_argument('--info-cache-size', type=int, metavar='MB',
+                        help='disk budget of the metadata cache (default: 256 MB)')
+    parser.add_argument('--store', metavar='DB',
+                        help='shared SQLite job store; several nodes pointing at it split the URLs')
+    parser.add_argument('--node', metavar='NAME', help='node name in the job store (default: host-pid)')
+    parser.add_argument('--lease', type=float, default=60.0, metavar='SEC',
+                        help='job lease time; jobs of nodes silent this long are taken over (default: 60)')
+    parser.add_argument('--resume', action='store_true', help='resume the unfinished batch from the journal first')
+    parser.add_argument('--limit-rate', metavar='RATE', help='total download bandwidth cap, e.g. 5M (bytes/s)')
+    parser.add_argument('--host-limit-rate', action='append', metavar='HOST=RATE',
+                        help='per-platform cap, e.g. youtube=2M (repeatable)')
+    parser.add_argument('--rate-schedule', action='append', metavar='HH:MM-HH:MM=RATE',
+                        help='time-of-day total cap, e.g. 09:00-18:00=2M (repeatable)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running')
+    parser.add_argument('--update-yt-dlp', action='store_true', help='upgrade yt-dlp before downloading (alone: upgrade and exit)')
+    parser.add_argument('--json', nargs='?', const='-', metavar='PATH',
+                        help="write a JSON summary to PATH (or stdout when PATH is omitted)")
+    return parser
+
 
 def main():
     """Ana fonksiyon"""
+    if len(sys.argv) > 1:
+        args = build_arg_parser().parse_args()
+        if (args.workers is not None and args.workers < 1) or (args.pp_workers is not None and args.pp_workers < 1):
+            print("❌ Worker counts must be at least 1", file=sys.stderr)
+            sys.exit(EXIT_USAGE)
+        try:
+            sys.exit(NexLoadCore().run_headless(args))
+        except KeyboardInterrupt:
+            _terminate_child_processes()
+            print("\n⚠️ Interrupted", file=sys.stderr)
+            sys.exit(EXIT_INTERRUPTED)
+
     try:
         app = NexLoadCore()
         app.run()
     except KeyboardInterrupt:
+        _terminate_child_processes()
         print(f"\n\n⚠️ Program stopped by user!")
         print(f"👋 Goodbye from NexLoad!")
     except Exception as e:
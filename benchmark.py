@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔═══════════════════════════════════════════════════════════════════════════╗
+║                     NEXLOAD - OFFLINE BENCHMARK SUITE                     ║
+╠═══════════════════════════════════════════════════════════════════════════╣
+║  Yerel HTTP sunucusundan sentetik medya indirerek NexLoadCore batch       ║
+║  yolunu worker sayısı, dosya boyutu karışımı ve hata oranına göre ölçer.  ║
+║                                                                           ║
+║  Kullanım:                                                                ║
+║    python benchmark.py --workers 1,2,4,8 --mix mixed --output bench.json  ║
+║                                                                           ║
+║  Rapor (JSON): makespan, throughput, son işlem CPU süresi, peak RSS       ║
+╚═══════════════════════════════════════════════════════════════════════════╝
+"""
+
+import os
+import sys
+import re
+import io
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Boyut karışımları (MB); dosyalar bu listeden sırayla atanır
+SIZE_MIXES = {
+    'small': [1, 2],
+    'mixed': [1, 4, 16],
+    'large': [32],
+}
+
+
+class MediaServer:
+    """Sentetik medya sunan, Range destekli ve hata enjeksiyonlu yerel HTTP sunucusu"""
+
+    def __init__(self, media_dir, bandwidth=0, latency=0.0, fail_rate=0.0, seed=0):
+        self.media_dir = media_dir
+        self.bandwidth = bandwidth  # Bağlantı başına byte/s (0 = sınırsız)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.injected_failures = 0
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def _should_fail(self):
+        with self.random_lock:
+            self.requests += 1
+            if self.fail_rate and self.random.random() < self.fail_rate:
+                self.injected_failures += 1
+                return self.random.choice(('status', 'drop'))
+        return None
+
+    def start(self):
+        """Sunucuyu arka plan thread'inde başlatır"""
+        media = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send_empty(self, status):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                if media.latency:
+                    time.sleep(media.latency)
+                path = self.path.split('?', 1)[0]
+                if path.startswith('/media/') and path.endswith('.json'):
+                    return self._send_metadata(path[len('/media/'):-len('.json')])
+                if path.startswith('/files/'):
+                    return self._send_file(os.path.basename(path))
+                self._send_empty(404)
+
+            def _send_metadata(self, video_id):
+                match = re.match(r'(\d+)mb-\d+$', video_id)
+                file_name = f'bench-{match.group(1)}mb.mp4' if match else ''
+                file_path = os.path.join(media.media_dir, file_name)
+                if not match or not os.path.isfile(file_path):
+                    return self._send_empty(404)
+                body = json.dumps({
+                    'id': video_id,
+                    'title': f'NexLoad Bench {video_id}',
+                    'file': file_name,
+                    'size': os.path.getsize(file_path),
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_file(self, file_name):
+                file_path = os.path.join(media.media_dir, file_name)
+                if not os.path.isfile(file_path):
+                    return self._send_empty(404)
+                failure = media._should_fail()
+                if failure == 'status':
+                    return self._send_empty(503)
+
+                size = os.path.getsize(file_path)
+                start, end = 0, size - 1
+                range_header = self.headers.get('Range')
+                if range_header:
+                    match = re.match(r'bytes=(\d*)-(\d*)', range_header)
+                    start = int(match.group(1) or 0)
+                    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                else:
+                    self.send_response(200)
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+
+                remaining = end - start + 1
+                # 'drop' hatası: gövdenin yarısında bağlantı kesilir
+                cut_at = remaining // 2 if failure == 'drop' else None
+                sent = 0
+                with open(file_path, 'rb') as f:
+                    f.seek(start)
+                    while remaining > 0:
+                        chunk = f.read(min(64 * 1024, remaining))
+                        if not chunk:
+                            break
+                        if cut_at is not None and sent + len(chunk) > cut_at:
+                            self.close_connection = True
+                            return
+                        try:
+                            self.wfile.write(chunk)
+                        except OSError:
+                            return
+                        sent += len(chunk)
+                        remaining -= len(chunk)
+                        if media.bandwidth:
+                            time.sleep(len(chunk) / media.bandwidth)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        """Sunucuyu kapatır"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def build_bench_extractor():
+    """Yerel sunucudaki /media/<id> adreslerini çözen yt-dlp extractor sınıfını oluşturur"""
+    from yt_dlp.extractor.common import InfoExtractor
+
+    class NexLoadBenchIE(InfoExtractor):
+        IE_NAME = 'nexload:bench'
+        _VALID_URL = r'https?://127\.0\.0\.1:\d+/media/(?P<id>\d+mb-\d+)$'
+
+        def _real_extract(self, url):
+            video_id = self._match_id(url)
+            meta = self._download_json(url + '.json', video_id)
+            base = url.split('/media/', 1)[0]
+            return {
+                'id': video_id,
+                'title': meta['title'],
+                'formats': [{
+                    'format_id': 'mp4-720p',
+                    'url': f"{base}/files/{meta['file']}",
+                    'ext': 'mp4',
+                    'vcodec': 'avc1.64001f',
+                    'acodec': 'mp4a.40.2',
+                    'width': 1280,
+                    'height': 720,
+                    'filesize': meta['size'],
+                }],
+            }
+
+    return NexLoadBenchIE
+
+
+def prepare_media(media_dir, sizes_mb, ffmpeg):
+    """Her boyut için yaklaşık o büyüklükte gerçek bir H.264/AAC mp4 üretir"""
+    os.makedirs(media_dir, exist_ok=True)
+    bitrate_mbit = 8
+    for size in sorted(set(sizes_mb)):
+        path = os.path.join(media_dir, f'bench-{size}mb.mp4')
+        if os.path.isfile(path):
+            continue
+        duration = max(1, size * 8 // bitrate_mbit)
+        command = [
+            ffmpeg, '-loglevel', 'error', '-y',
+            '-f', 'lavfi', '-i', 'testsrc2=size=1280x720:rate=30,noise=alls=40:allf=t+u',
+            '-f', 'lavfi', '-i', 'sine=frequency=440',
+            '-t', str(duration),
+            '-c:v', 'libx264', '-preset', 'ultrafast',
+            '-b:v', f'{bitrate_mbit}M', '-maxrate', f'{bitrate_mbit}M', '-bufsize', f'{bitrate_mbit}M',
+            '-c:a', 'aac', '-b:a', '128k', '-shortest',
+            path + '.tmp.mp4',
+        ]
+        subprocess.run(command, check=True)
+        os.replace(path + '.tmp.mp4', path)
+
+
+def _rusage():
+    """(kendi CPU, çocuk süreç (ffmpeg) CPU, kendi peak RSS MB)"""
+    if resource is None:
+        return None, None, None
+    # Linux ru_maxrss KB, macOS byte cinsindendir
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime, own.ru_maxrss / scale
+
+
+def run_scenario(scenario):
+    """Tek senaryoyu bu süreçte çalıştırır (ölçümler süreç başına izole olsun diye alt süreçte çağrılır)"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import NexLoad
+
+    output_dir = scenario['output_dir']
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+    core = NexLoad.NexLoadCore()
+    core.downloads_path = output_dir
+    core.use_archive = False
+    core.extra_extractors = [build_bench_extractor()]
+    core.platform_domains['127.0.0.1'] = 'bench'
+    # Politeness gecikmesi ölçülen paralelliği bastırmasın
+    core.host_limits['bench'] = {'max_concurrent': 1024, 'min_interval': 0.0}
+    core.max_workers = scenario['workers']
+    core.max_workers_cap = max(core.max_workers_cap, scenario['workers'])
+    core.adaptive_workers = scenario['adaptive']
+    core.job_order = scenario.get('order', core.job_order)
+    core.progress_board = NexLoad.ProgressBoard(stream=io.StringIO(), status_interval=3600)
+
+    _, format_selector = core.quality_options[scenario['quality']]
+    cpu_before, child_cpu_before, _ = _rusage()
+    stats = core._run_batch(scenario['urls'], format_selector)
+    cpu_after, child_cpu_after, peak_rss = _rusage()
+
+    elapsed = stats['elapsed']
+    postprocess = stats['stages']['postprocess']
+    return {
+        'files': stats['total'],
+        'successful': stats['successful'],
+        'failed': stats['failed'],
+        'bytes': stats['total_size'],
+        'makespan': round(elapsed, 3),
+        'throughput_mbps': round(stats['total_size'] / (1024 * 1024) / elapsed, 3) if elapsed > 0 else 0.0,
+        'postprocess_cpu_seconds': round(child_cpu_after - child_cpu_before, 3) if resource else None,
+        'postprocess_busy_seconds': round(postprocess['utilization'] * postprocess['workers'] * elapsed, 3),
+        'main_cpu_seconds': round(cpu_after - cpu_before, 3) if resource else None,
+        'peak_rss_mb': round(peak_rss, 1) if resource else None,
+        'concurrency': stats['concurrency'],
+        'connections': stats['connections'],
+        'stages': stats['stages'],
+        'errors': [error['error'][:120] for error in stats.get('errors', [])][:5],
+    }
+
+
+def _parse_list(value, cast):
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+
+def build_arg_parser():
+    """Benchmark komut satırı argümanlarını tanımlar"""
+    parser = argparse.ArgumentParser(description='NexLoad offline batch benchmark')
+    parser.add_argument('--workers', default='1,2,4,8', help='comma separated worker counts (default: 1,2,4,8)')
+    parser.add_argument('--mix', default='mixed', help=f"comma separated size mixes: {', '.join(SIZE_MIXES)}")
+    parser.add_argument('--fail-rate', default='0', help='comma separated failure injection rates (0-1)')
+    parser.add_argument('--files', type=int, default=8, help='files per scenario (default: 8)')
+    parser.add_argument('--bandwidth', type=float, default=4.0, help='per-connection bandwidth in MB/s, 0 = unlimited')
+    parser.add_argument('--latency', type=float, default=0.02, help='per-request latency in seconds')
+    parser.add_argument('--quality', default='4', help='NexLoad quality key (default: 4 = 720p)')
+    parser.add_argument('--adaptive', action='store_true', help='use AIMD worker control instead of fixed workers')
+    parser.add_argument('--order', default='longest', help='comma separated job orders: longest, shortest, fifo')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per scenario')
+    parser.add_argument('--media-dir', help='directory for generated media (reused between runs)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    return parser
+
+
+def main():
+    """Senaryo matrisini çalıştırır ve JSON raporu yazar"""
+    args = build_arg_parser().parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(json.loads(args.scenario))))
+        return 0
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        print('❌ ffmpeg is required to generate benchmark media', file=sys.stderr)
+        return 2
+    workers_list = _parse_list(args.workers, int)
+    mixes = _parse_list(args.mix, str)
+    fail_rates = _parse_list(args.fail_rate, float)
+    orders = _parse_list(args.order, str)
+    unknown = [mix for mix in mixes if mix not in SIZE_MIXES]
+    unknown += [order for order in orders if order not in ('longest', 'shortest', 'fifo')]
+    if unknown or not workers_list or min(workers_list) < 1 or not orders:
+        print(f"❌ Invalid --workers, --mix or --order ({', '.join(unknown)})", file=sys.stderr)
+        return 2
+
+    work_dir = tempfile.mkdtemp(prefix='nexload-bench-')
+    media_dir = args.media_dir or os.path.join(work_dir, 'media')
+    print(f'🎞️ Preparing media in {media_dir}...', file=sys.stderr)
+    prepare_media(media_dir, [size for mix in mixes for size in SIZE_MIXES[mix]], ffmpeg)
+
+    server = MediaServer(media_dir, bandwidth=int(args.bandwidth * 1024 * 1024),
+                         latency=args.latency, seed=args.seed)
+    base_url = server.start()
+
+    results = []
+    try:
+        for mix in mixes:
+            sizes = SIZE_MIXES[mix]
+            urls = [f'{base_url}/media/{sizes[i % len(sizes)]}mb-{i}' for i in range(args.files)]
+            for fail_rate in fail_rates:
+                for workers in workers_list:
+                    for order in orders:
+                        for run in range(args.repeat):
+                            server.fail_rate = fail_rate
+                            injected = server.injected_failures
+                            scenario = {
+                                'workers': workers,
+                                'adaptive': args.adaptive,
+                                'order': order,
+                                'quality': args.quality,
+                                'urls': urls,
+                                'output_dir': os.path.join(work_dir, 'out'),
+                            }
+                            # Her senaryo ayrı süreçte: peak RSS ve çocuk CPU ölçümleri karışmaz
+                            completed = subprocess.run(
+                                [sys.executable, os.path.abspath(__file__), '--scenario', json.dumps(scenario)],
+                                capture_output=True, text=True, timeout=1800)
+                            if completed.returncode != 0:
+                                print(completed.stderr, file=sys.stderr)
+                                raise RuntimeError(f'scenario failed: workers={workers} mix={mix} fail_rate={fail_rate} order={order}')
+                            result = json.loads(completed.stdout.strip().splitlines()[-1])
+                            result.update({'mix': mix, 'fail_rate': fail_rate, 'workers': workers, 'order': order, 'run': run,
+                                           'injected_failures': server.injected_failures - injected})
+                            results.append(result)
+                            print(f"  {mix:<6} fail={fail_rate:<4} workers={workers:<3} order={order:<8} "
+                                  f"makespan={result['makespan']:.2f}s throughput={result['throughput_mbps']:.2f} MB/s "
+                                  f"ok={result['successful']}/{result['files']}", file=sys.stderr)
+    finally:
+        server.stop()
+        shutil.rmtree(os.path.join(work_dir, 'out'), ignore_errors=True)
+        if not args.media_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Aynı karışım/hata oranı/sıralamadaki en düşük worker sayısına göre hızlanma
+    for result in results:
+        group = [r for r in results if r['mix'] == result['mix'] and r['fail_rate'] == result['fail_rate']
+                 and r['order'] == result['order']]
+        baseline = min(group, key=lambda r: (r['workers'], r['run']))
+        result['speedup'] = round(baseline['makespan'] / result['makespan'], 2) if result['makespan'] else None
+
+    try:
+        import yt_dlp
+        yt_dlp_version = yt_dlp.version.__version__
+    except ImportError:
+        yt_dlp_version = None
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'yt_dlp': yt_dlp_version,
+        },
+        'config': {
+            'files': args.files,
+            'bandwidth_mbps_per_connection': args.bandwidth,
+            'latency': args.latency,
+            'quality': args.quality,
+            'adaptive': args.adaptive,
+            'orders': orders,
+            'sizes_mb': {mix: SIZE_MIXES[mix] for mix in mixes},
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
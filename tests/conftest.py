@@ -0,0 +1,54 @@
+import io
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+import NexLoad
+
+
+@pytest.fixture(scope='session')
+def media_dir(tmp_path_factory):
+    """MediaServer'ın sunduğu gerçek bench-<N>mb.mp4 dosyaları (son işlem ffmpeg ile doğrulanır)"""
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        pytest.skip('ffmpeg is required to generate test media')
+    root = tmp_path_factory.mktemp('media')
+    benchmark.prepare_media(str(root), [1, 2], ffmpeg)
+    return root
+
+
+@pytest.fixture
+def media_server(media_dir):
+    """Yerel MediaServer; testler fail_rate/bandwidth değerlerini çalışırken değiştirebilir"""
+    server = benchmark.MediaServer(str(media_dir))
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Yerel sunucu için ayarlanmış, kısa geri çekilme süreli NexLoadCore"""
+    core = NexLoad.NexLoadCore()
+    core.downloads_path = str(tmp_path / 'downloads')
+    os.makedirs(core.downloads_path, exist_ok=True)
+    core.use_archive = False
+    core.use_info_cache = False
+    core.adaptive_workers = False
+    core.max_workers = 2
+    core.extra_extractors = [benchmark.build_bench_extractor()]
+    core.platform_domains['127.0.0.1'] = 'bench'
+    core.host_limits['bench'] = {'max_concurrent': 4, 'min_interval': 0.0}
+    core.retry_policy = {
+        'transient': {'retries': 2, 'base': 0.05, 'cap': 0.2},
+        'throttled': {'retries': 2, 'base': 0.05, 'cap': 0.2},
+        'format': {'retries': 1, 'base': 0.0, 'cap': 0.0},
+        'unknown': {'retries': 1, 'base': 0.05, 'cap': 0.2},
+    }
+    core.progress_board = NexLoad.ProgressBoard(stream=io.StringIO(), status_interval=3600)
+    yield core
@@ -0,0 +1,19 @@
+"""Testlerde alt süreç olarak çalışan depo düğümü: yerel bench sunucusunu tanıyan headless NexLoad"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+import NexLoad
+
+
+if __name__ == '__main__':
+    app = NexLoad.NexLoadCore()
+    app.extra_extractors = [benchmark.build_bench_extractor()]
+    app.platform_domains['127.0.0.1'] = 'bench'
+    app.host_limits['bench'] = {'max_concurrent': 64, 'min_interval': 0.0}
+    app.progress_board = NexLoad.ProgressBoard(stream=io.StringIO(), status_interval=3600)
+    app.store_poll_interval = 0.2
+    sys.exit(app.run_headless(NexLoad.build_arg_parser().parse_args(sys.argv[1:])))
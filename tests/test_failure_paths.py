@@ -0,0 +1,220 @@
+import io
+import json
+import os
+import threading
+import time
+
+from yt_dlp.utils import DownloadError
+
+import NexLoad
+
+
+def _media_url(server, size=1, index=0):
+    return f'{server.base_url}/media/{size}mb-{index}'
+
+
+def test_exhausted_ytdlp_retries_are_transient(app):
+    # yt-dlp deneme hakkı bitince exc_info olmadan yalnızca mesaj iletir
+    for message in (
+        'ERROR: \r[download] Got error: HTTP Error 503: Service Unavailable. Giving up after 10 retries',
+        'ERROR: \r[download] Got error: 393216 bytes read, 508792 more expected. Giving up after 10 retries',
+        'ERROR: [generic] x: Unable to download webpage: <urlopen error [Errno 111] Connection refused>',
+        'ERROR: [generic] x: Unable to download webpage: HTTP Error 408: Request Timeout',
+    ):
+        assert app._classify_error(DownloadError(message), downloading=True) == 'transient', message
+    gone = DownloadError('ERROR: [generic] x: Unable to download webpage: HTTP Error 404: Not Found')
+    assert app._classify_error(gone) == 'permanent'
+    assert app._classify_error(DownloadError('ERROR: [youtube] x: Private video')) == 'permanent'
+
+
+def test_http_503_is_transient_in_every_form(app):
+    from yt_dlp.networking.common import Response
+    from yt_dlp.networking.exceptions import HTTPError
+
+    def http_error(status):
+        return HTTPError(Response(io.BytesIO(b''), 'http://x', {}, status=status))
+
+    message = DownloadError('ERROR: [generic] x: Unable to download webpage: HTTP Error 503: Service Unavailable')
+    assert app._classify_error(http_error(503)) == app._classify_error(message) == 'transient'
+    assert app._classify_error(http_error(429)) == 'throttled'
+
+
+def test_unknown_errors_are_transient_with_a_smaller_budget(app):
+    error = DownloadError('ERROR: something nobody anticipated')
+    assert app._error_kind(error) == 'unknown'
+    assert app._classify_error(error) == 'transient'
+    attempts = {}
+    assert app._retry_delay('unknown', attempts) is not None
+    assert app._retry_delay('unknown', attempts) is None
+    assert app.retry_policy['unknown']['retries'] < app.retry_policy['transient']['retries']
+
+
+def test_error_chain_follows_context(app):
+    try:
+        try:
+            raise ConnectionResetError('reset by peer')
+        except ConnectionResetError:
+            raise DownloadError('ERROR: wrapped')
+    except DownloadError as error:
+        assert app._classify_error(error) == 'transient'
+
+
+def test_server_failures_are_retried_then_recorded_as_transient(app, media_server):
+    media_server.fail_rate = 1.0
+    stats = app._run_batch([_media_url(media_server)], 'best')
+    assert stats['successful'] == 0 and stats['failed'] == 1
+    assert stats['failure_categories'] == {'transient': 1}
+    assert stats['retries'].get('transient') == app.retry_policy['transient']['retries']
+
+
+def test_flaky_server_recovers_through_retries(app, media_server):
+    media_server.fail_rate = 0.5
+    urls = [_media_url(media_server, index=i) for i in range(4)]
+    stats = app._run_batch(urls, 'best')
+    assert stats['successful'] == 4 and stats['failed'] == 0
+    assert media_server.injected_failures > 0
+    assert len([name for name in os.listdir(app.downloads_path) if name.endswith('.mp4')]) == 4
+
+
+def _segment_files(app):
+    return sorted(name for name in os.listdir(app.downloads_path) if name.endswith(('.part', '.segments')))
+
+
+def test_failed_probe_keeps_segmented_partials(app, media_server, monkeypatch):
+    app.segment_min_size = 256 * 1024
+    app.max_workers = 1
+    media_server.bandwidth = 64 * 1024
+    url = _media_url(media_server, size=2)
+    threading.Timer(1.0, app.batch_control.stop).start()
+    stats = app._run_batch([url], 'best')
+    assert stats['stopped'] and stats['interrupted'] == 1
+    partials = _segment_files(app)
+    assert any(name.endswith('.part.segments') for name in partials)
+
+    # Yalnızca Range probe'u 503 alır; yarım kalan aralıklar silinmeden tek bağlantıyla tamamlanmalı
+    media_server.bandwidth = 0
+    state_name = next(name for name in partials if name.endswith('.segments'))
+    with open(os.path.join(app.downloads_path, state_name), encoding='utf-8') as f:
+        unfinished = [r for r in json.load(f)['ranges'] if r[0] + r[2] <= r[1]]
+    failures = iter(['status'])
+    should_fail = media_server._should_fail
+    monkeypatch.setattr(media_server, '_should_fail', lambda: should_fail() or next(failures, None))
+    requests_before = media_server.requests
+    stats = app._run_batch([url], 'best')
+    assert stats['successful'] == 1
+    assert _segment_files(app) == []
+    # Probe + yalnızca bitmemiş aralıklar; dosya baştan indirilmez
+    assert media_server.requests - requests_before == 1 + len(unfinished)
+
+
+def test_small_known_size_skips_range_probe(app, media_server):
+    stats = app._run_batch([_media_url(media_server, size=1)], 'best')
+    assert stats['successful'] == 1
+    # Boyut extractor'dan biliniyor ve segment eşiğinin altında: tek GET, probe yok
+    assert media_server.requests == 1
+
+
+def test_undetected_playlist_downloads_every_entry(app, media_server):
+    from yt_dlp.extractor.common import InfoExtractor
+
+    class BenchListIE(InfoExtractor):
+        # _RETURN_TYPE yok: URL'den playlist olduğu anlaşılamaz, tek medya gibi kuyruğa girer
+        _VALID_URL = r'https?://127\.0\.0\.1:\d+/list/(?P<id>\d+)$'
+
+        def _real_extract(self, url):
+            count = int(self._match_id(url))
+            base = url.split('/list/', 1)[0]
+            return self.playlist_result(
+                [self.url_result(f'{base}/media/1mb-{i}') for i in range(count)], 'list', 'Bench List')
+
+    app.extra_extractors.insert(0, BenchListIE)
+    stats = app._run_batch([f'{media_server.base_url}/list/2'], 'best')
+    assert stats['successful'] == 1 and stats['failed'] == 0
+    assert len([name for name in os.listdir(app.downloads_path) if name.endswith('.mp4')]) == 2
+
+
+def test_circuit_breaker_trips_with_growing_cooldown():
+    breaker = NexLoad.CircuitBreaker(window=4, threshold=0.5, min_samples=2, cooldown=10.0)
+    assert breaker.record('bench', failed=True) is None
+    first = breaker.record('bench', failed=True)
+    assert first is not None and 9.0 < first - time.time() <= 10.0
+    breaker.record('bench', failed=True)
+    second = breaker.record('bench', failed=True)
+    assert 19.0 < second - time.time() <= 20.0
+    # Toparlanan host'un sonraki açılması yine kısa sürer
+    for _ in range(3):
+        assert breaker.record('bench', failed=False) is None
+    assert breaker.record('bench', failed=True) is None
+    third = breaker.record('bench', failed=True)
+    assert third is not None and third - time.time() <= 10.0
+
+
+def test_failing_host_is_paused_by_circuit_breaker(app, media_server):
+    app.circuit_breaker_options = dict(app.circuit_breaker_options, min_samples=2, cooldown=0.1)
+    media_server.fail_rate = 1.0
+    urls = [_media_url(media_server, index=i) for i in range(3)]
+    stats = app._run_batch(urls, 'best')
+    assert stats['failed'] == 3
+    assert stats['failure_categories'] == {'transient': 3}
+    assert stats['paused_hosts'].get('bench', 0) >= 1
+
+
+def test_stopped_batch_does_not_cancel_later_downloads(app, media_server):
+    media_server.bandwidth = 128 * 1024
+    urls = [_media_url(media_server, size=2, index=i) for i in range(2)]
+    threading.Timer(0.5, app.batch_control.stop).start()
+    stats = app._run_batch(urls, 'best')
+    assert stats['stopped'] and stats['interrupted'] >= 1
+    assert not app.batch_control.stopping
+
+    media_server.bandwidth = 0
+    assert app._download_with_retries(urls[0], 'best', False)
+    stats = app._run_batch(urls, 'best')
+    assert stats['successful'] == 2 and not stats['stopped']
+
+
+def test_cancelled_job_ends_without_failing_the_batch(app, media_server):
+    media_server.bandwidth = 128 * 1024
+    slow, fast = _media_url(media_server, size=2, index=0), _media_url(media_server, size=1, index=1)
+    threading.Timer(0.5, app.batch_control.cancel, args=(slow,)).start()
+    stats = app._run_batch([slow, fast], 'best')
+    assert stats['cancelled'] == 1 and stats['successful'] == 1 and stats['failed'] == 0
+
+
+def test_metrics_record_each_job_once_with_cumulative_retries(app, media_server):
+    media_server.fail_rate = 1.0
+    stats = app._run_batch([_media_url(media_server, index=i) for i in range(2)], 'best')
+    assert stats['failed'] == 2
+
+    with open(app._state_file('metrics.jsonl'), encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    retries = app.retry_policy['transient']['retries']
+    assert [(r['status'], r['retries']) for r in records] == [('failed', retries)] * 2
+    counters = app.metrics.counters
+    assert counters[('nexload_jobs_total', (('status', 'failed'),))] == 2
+    assert ('nexload_jobs_total', (('status', 'retrying'),)) not in counters
+    assert counters[('nexload_retries_total', ())] == 2 * retries
+
+
+def test_only_unavailable_formats_invalidate_cached_info(app):
+    from yt_dlp.utils import PostProcessingError
+
+    unavailable = DownloadError('ERROR: [youtube] x: Requested format is not available')
+    assert app._classify_error(unavailable) == 'format'
+    assert app._is_format_unavailable(unavailable)
+    # Birleştirme/son işlem hatası metadata'yı bayatlatmaz; bilgi yeniden çıkarılmaz
+    postprocess = PostProcessingError('Conversion failed!')
+    assert app._classify_error(postprocess) == 'format'
+    assert not app._is_format_unavailable(postprocess, downloading=True)
+
+
+def test_format_resolution_matches_ytdlp_selection(app):
+    formats = [
+        {'format_id': 'a', 'url': 'http://x/a', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': 128},
+        {'format_id': 'v', 'url': 'http://x/v', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none', 'height': 720},
+        {'format_id': 'm', 'url': 'http://x/m', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'mp4a.40.2', 'height': 360},
+    ]
+    selected, chosen = app._resolve_format({'formats': formats}, 'best')
+    assert selected == 'm' and [f['format_id'] for f in chosen] == ['m']
+    selected, _ = app._resolve_format({'formats': formats}, 'bestaudio', exclude=('a',))
+    assert selected not in (None, 'a')
@@ -0,0 +1,75 @@
+import json
+import signal
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import NexLoad
+
+NODE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'store_node.py')
+
+
+def _start_node(tmp_path, db, name, *extra, stdin=subprocess.DEVNULL):
+    command = [sys.executable, NODE, '--store', str(db), '--node', name, '-o', str(tmp_path / name),
+               '--json', str(tmp_path / f'{name}.json'), '-q', '720p', '--no-archive', '-w', '2',
+               '--fixed-workers', '--lease', '2', *extra]
+    return subprocess.Popen(command, stdin=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _job_states(db):
+    with sqlite3.connect(db) as conn:
+        return dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+
+def test_nodes_share_store_and_take_over_killed_node(tmp_path, media_server):
+    media_server.bandwidth = 1024 * 1024
+    db = tmp_path / 'jobs.db'
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('\n'.join(f'{media_server.base_url}/media/1mb-{i}' for i in range(12)))
+    feeder = _start_node(tmp_path, db, 'A', '-i', str(urls))
+    time.sleep(1.0)
+    workers = [_start_node(tmp_path, db, name) for name in ('B', 'C')]
+    time.sleep(1.5)
+    workers[1].kill()
+    assert feeder.wait(timeout=120) == NexLoad.EXIT_OK
+    assert workers[0].wait(timeout=120) == NexLoad.EXIT_OK
+    assert _job_states(db) == {'done': 12}
+    report = json.loads((tmp_path / 'A.json').read_text())
+    assert report['cluster']['status'] == {'done': 12}
+
+
+def test_store_is_sealed_when_feeder_dies_before_sealing(tmp_path, media_server):
+    db = tmp_path / 'jobs.db'
+    # Besleyen düğüm birkaç URL ekledikten sonra mühürlemeden ölür (kiralaması yenilenmez)
+    feeder = NexLoad.JobStore(str(db), node='A', lease_seconds=2)
+    feeder.set_meta('settings', {'format': 'best', 'audio': False, 'quality': '720p'})
+    feeder.start_feeding()
+    feeder.add(f'{media_server.base_url}/media/1mb-{i}' for i in range(3))
+    assert not feeder.sealed()
+    feeder._db.close()
+
+    started = time.time()
+    worker = _start_node(tmp_path, db, 'B')
+    assert worker.wait(timeout=60) == NexLoad.EXIT_OK
+    assert _job_states(db) == {'done': 3}
+    assert time.time() - started < 30
+
+
+def test_stopped_feeding_node_exits_while_input_is_open(tmp_path, media_server):
+    db = tmp_path / 'jobs.db'
+    feeder = _start_node(tmp_path, db, 'A', '-i', '-', stdin=subprocess.PIPE)
+    feeder.stdin.write(''.join(f'{media_server.base_url}/media/1mb-{i}\n' for i in range(550)).encode())
+    feeder.stdin.flush()
+    deadline = time.time() + 30
+    while time.time() < deadline and not (db.exists() and _job_states(db)):
+        time.sleep(0.2)
+    # stdin açık kalır: durdurulan düğüm girdinin bitmesini beklememeli
+    feeder.send_signal(signal.SIGTERM)
+    try:
+        assert feeder.wait(timeout=60) == NexLoad.EXIT_INTERRUPTED
+    finally:
+        feeder.kill()
+        feeder.stdin.close()
+    assert 0 < sum(_job_states(db).values()) <= 550
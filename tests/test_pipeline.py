@@ -0,0 +1,52 @@
+def test_postprocess_queue_is_bounded_and_carries_only_needed_fields(app, media_server, monkeypatch):
+    app.postprocess_workers = 1
+    app.max_workers = 3
+    sizes, jobs = [], []
+    postprocess_worker, postprocess_media = app._postprocess_worker, app._postprocess_media
+
+    def worker(queue, stage_stats):
+        sizes.append(queue.maxsize)
+        return postprocess_worker(queue, stage_stats)
+
+    def media(job):
+        jobs.append(job)
+        return postprocess_media(job)
+
+    monkeypatch.setattr(app, '_postprocess_worker', worker)
+    monkeypatch.setattr(app, '_postprocess_media', media)
+    urls = [f'{media_server.base_url}/media/1mb-{i}' for i in range(4)]
+    stats = app._run_batch(urls, 'best')
+    assert stats['successful'] == 4
+    assert sizes == [2]
+    for job in jobs:
+        for item in job['items']:
+            assert item['filepath'].endswith('.mp4') and item['title'].startswith('NexLoad Bench')
+            assert 'formats' not in item and 'http_headers' not in item
+
+
+def test_every_downloader_is_closed_after_its_job(app, media_server, monkeypatch):
+    opened = []
+    new_ydl = app._new_ydl
+
+    def tracked(ydl_opts, host=None):
+        ydl = new_ydl(ydl_opts, host=host)
+        close = ydl.close
+        state = {'closed': False}
+        ydl.close = lambda: (state.update(closed=True), close())
+        opened.append(state)
+        return ydl
+
+    monkeypatch.setattr(app, '_new_ydl', tracked)
+    media_server.fail_rate = 0.0
+    urls = [f'{media_server.base_url}/media/1mb-{i}' for i in range(3)] + [f'{media_server.base_url}/missing']
+    stats = app._run_batch(urls, 'best')
+    assert stats['successful'] == 3 and stats['failed'] == 1
+    assert opened and all(state['closed'] for state in opened)
+
+
+def test_unknown_formats_are_remuxed_not_transcoded(app):
+    mode, opts = app._plan_postprocess([])
+    assert mode == 'remux'
+    assert [pp['key'] for pp in opts['postprocessors']] == ['FFmpegVideoRemuxer', 'FFmpegMetadata']
+    vp9 = {'format_id': 'v', 'ext': 'webm', 'vcodec': 'vp9', 'acodec': 'opus'}
+    assert app._plan_postprocess([vp9])[0] == 'transcode'
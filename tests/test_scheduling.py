@@ -0,0 +1,51 @@
+import json
+import time
+
+import NexLoad
+
+
+def test_idle_workers_do_not_hold_concurrency_slots(app, media_server):
+    samples = []
+
+    def slow_feed():
+        yield f'{media_server.base_url}/media/1mb-0'
+        # İlk iş biterken kuyruk boş kalır; bekleyen worker'lar slot tutmamalı
+        time.sleep(2.0)
+        samples.append(app.download_semaphore._active)
+        yield f'{media_server.base_url}/media/1mb-1'
+
+    app.probe_workers = 0
+    stats = app._run_batch(slow_feed(), 'best')
+    assert stats['successful'] == 2
+    assert samples == [0]
+
+
+
+def test_host_accounting_starts_when_a_slot_is_held():
+    scheduler = NexLoad.HostScheduler({'default': {'max_concurrent': 4, 'min_interval': 0.3}})
+    for seq in range(3):
+        scheduler.put('bench', {'seq': seq, 'host': 'bench'})
+    scheduler.close()
+    # Hazır iş olduğunu bilmek host sayacını ve aralığı tüketmez
+    assert scheduler.wait_ready() and scheduler.wait_ready()
+    first = scheduler.take()
+    assert first['seq'] == 0
+    assert scheduler.take() is None  # min_interval dolmadı
+
+    started = time.time()
+    assert scheduler.wait_ready()
+    assert time.time() - started >= 0.25
+    # Slot beklerken host duraklatıldıysa iş verilmez
+    scheduler.pause_host('bench', time.time() + 60)
+    assert scheduler.take() is None
+
+
+def test_explicit_worker_count_is_a_hard_limit(app, media_server, tmp_path):
+    app.adaptive_workers = True
+    report = tmp_path / 'report.json'
+    urls = [f'{media_server.base_url}/media/1mb-{i}' for i in range(3)]
+    args = NexLoad.build_arg_parser().parse_args(
+        ['-w', '1', '-q', '720p', '--no-archive', '-o', app.downloads_path, '--json', str(report), *urls])
+    assert app.run_headless(args) == NexLoad.EXIT_OK
+    concurrency = json.loads(report.read_text())['concurrency']
+    assert concurrency['min'] == concurrency['max'] == concurrency['peak'] == 1
@@ -0,0 +1,84 @@
+import io
+import os
+import threading
+import time
+
+import NexLoad
+
+
+def test_connection_budget_grants_extras_only_from_idle_connections():
+    budget = NexLoad.ConnectionBudget(4)
+    budget.acquire()
+    budget.acquire()
+    assert budget.try_acquire_extra(5) == 2
+    assert budget.in_use == budget.peak == 4
+
+    # Temel bağlantı bekleyen indirme varken ek bağlantı verilmez
+    waiter = threading.Thread(target=budget.acquire)
+    waiter.start()
+    while not budget._waiting:
+        time.sleep(0.01)
+    budget.release(2)
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert budget.in_use == 3
+    assert budget.try_acquire_extra(3) == 1
+    assert budget.peak == 4
+
+
+def test_segmented_batch_stays_within_connection_budget(app, media_server):
+    app.max_connections = 3
+    app.segment_min_size = 256 * 1024
+    urls = [f'{media_server.base_url}/media/2mb-{i}' for i in range(2)]
+    stats = app._run_batch(urls, 'best')
+    assert stats['successful'] == 2
+    # İki temel bağlantının yanında segmentler yalnızca kalan tek boş bağlantıyı kullanabilir
+    assert app.connection_budget.peak == 3
+    assert app.connection_budget.in_use == 0
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def test_segmented_download_resumes_from_recorded_offsets(tmp_path):
+    data = os.urandom(256 * 1024)
+    path = str(tmp_path / 'media.part')
+    requests = []
+
+    def open_range(limit):
+        def opener(start, end):
+            requests.append(start)
+            body = io.BytesIO(data[start:end + 1])
+            if limit is None:
+                return body
+
+            class Response:
+                def read(self, size):
+                    if body.tell() >= limit:
+                        raise _Interrupted()
+                    return body.read(min(size, limit - body.tell()))
+
+                def close(self):
+                    body.close()
+            return Response()
+        return opener
+
+    first = NexLoad.SegmentedDownloader(open_range(16 * 1024), len(data), path, 4,
+                                        chunk_size=4 * 1024, fatal_errors=(_Interrupted,))
+    try:
+        first.download()
+    except _Interrupted:
+        pass
+    assert os.path.exists(path + '.segments')
+    recorded = [start + done for start, _, done in first._load_state()]
+    assert first.downloaded > 0
+
+    requests.clear()
+    second = NexLoad.SegmentedDownloader(open_range(None), len(data), path, 4, chunk_size=4 * 1024)
+    assert second.download()
+    # Her segment kaldığı byte'tan istenir; baştan indirme yapılmaz
+    assert sorted(requests) == sorted(recorded)
+    assert not os.path.exists(path + '.segments')
+    with open(path, 'rb') as f:
+        assert f.read() == data
@@ -0,0 +1,25 @@
+import types
+
+
+def test_short_link_hosts_are_valid_before_resolution(app):
+    for host in app.short_link_hosts:
+        assert app._validate_url(f'https://{host}/AbC123'), host
+    assert app._validate_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+    assert not app._validate_url('https://example.org/video.mp4')
+
+
+def test_short_links_resolve_in_input_order(app, monkeypatch):
+    calls = []
+
+    class Session:
+        def head(self, url, allow_redirects=True, timeout=None):
+            calls.append(url)
+            return types.SimpleNamespace(url=url.replace('https://t.co/', 'https://x.com/i/status/'))
+
+    monkeypatch.setattr(app, '_http_session', lambda host: Session())
+    urls = [f'https://t.co/{i % 50}' for i in range(200)] + ['https://youtu.be/dQw4w9WgXcQ']
+    resolved = list(app._resolve_urls(urls))
+    assert resolved[:200] == [f'https://x.com/i/status/{i % 50}' for i in range(200)]
+    assert resolved[-1] == 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    # Pencereden çıkan tekrarlar yönlendirme önbelleğinden gelir; her kısa link bir kez çözülür
+    assert sorted(calls) == sorted(f'https://t.co/{i}' for i in range(50))